@@ -0,0 +1,137 @@
+from django.db.models.signals import m2m_changed, post_save
+
+OWNER = 'owner'
+COLLABORATOR = 'collaborator'
+ROLE_CHOICES = [
+    (OWNER, 'Owner'),
+    (COLLABORATOR, 'Collaborator'),
+]
+
+# Maps each registered model to its access model and target column
+_registry = {}
+
+
+def accessible_ids(model, user, role=None):
+    """
+    Values queryset of the ids of ``model`` objects the user can access,
+    optionally only those they have ``role`` on.
+    """
+    access_model, column = _registry[model]
+    rows = access_model.objects.filter(user_id=user.pk)
+    if role is not None:
+        rows = rows.filter(role=role)
+    return rows.values(column)
+
+
+def has_access(obj, user):
+    """
+    Whether the user owns or collaborates on ``obj``.
+
+    Uses prefetched collaborators when available and otherwise a single
+    indexed lookup on the access table.
+    """
+    if user.pk is None:
+        return False
+    if obj.owner_id == user.pk:
+        return True
+    prefetched = getattr(obj, '_prefetched_objects_cache', {})
+    if 'collaborators' in prefetched:
+        return any(
+            collaborator.pk == user.pk
+            for collaborator in prefetched['collaborators'])
+    access_model, column = _registry[type(obj)]
+    return access_model.objects.filter(
+        user_id=user.pk, **{column: obj.pk}).exists()
+
+
+def request_has_access(request, obj):
+    """
+    ``has_access`` for the request's user, memoized on the request so
+    permission classes and views can repeat the check for free.
+    """
+    memo = getattr(request, '_access_memo', None)
+    if memo is None:
+        memo = request._access_memo = {}
+    key = (obj._meta.label, obj.pk)
+    if key not in memo:
+        memo[key] = has_access(obj, request.user)
+    return memo[key]
+
+
+def sync_owner_access(sender, instance, created, **kwargs):
+    """
+    Signal handler keeping the owner row of the access table current.
+    """
+    access_model, column = _registry[sender]
+    if created:
+        access_model.objects.create(
+            user_id=instance.owner_id, role=OWNER, **{column: instance.pk})
+    else:
+        access_model.objects.filter(
+            role=OWNER, **{column: instance.pk}
+        ).exclude(user_id=instance.owner_id).update(user_id=instance.owner_id)
+
+
+def sync_collaborator_access(sender, instance, action, reverse, model,
+                             pk_set, **kwargs):
+    """
+    Signal handler mirroring collaborator changes into the access table.
+
+    Handles changes made from either side of the relation, e.g.
+    ``project.collaborators.add(user)`` and
+    ``user.projects_collaborated.add(project)``.
+    """
+    target = model if reverse else type(instance)
+    access_model, column = _registry[target]
+    rows = access_model.objects.filter(role=COLLABORATOR)
+    if reverse:
+        rows = rows.filter(user_id=instance.pk)
+        pairs = [(instance.pk, pk) for pk in pk_set or ()]
+    else:
+        rows = rows.filter(**{column: instance.pk})
+        pairs = [(pk, instance.pk) for pk in pk_set or ()]
+
+    if action == 'post_add':
+        access_model.objects.bulk_create([
+            access_model(
+                user_id=user_id, role=COLLABORATOR, **{column: object_id})
+            for user_id, object_id in pairs
+        ], ignore_conflicts=True)
+    elif action == 'post_remove':
+        lookup = column if reverse else 'user_id'
+        rows.filter(**{f'{lookup}__in': pk_set}).delete()
+    elif action == 'post_clear':
+        rows.delete()
+
+
+def grant_bulk(model, objects, collaborator_pairs=()):
+    """
+    Add access rows for objects created with ``bulk_create``, which
+    bypasses the signals that normally maintain them.
+
+    ``collaborator_pairs`` holds ``(user_id, object_id)`` tuples.
+    """
+    access_model, column = _registry[model]
+    rows = [
+        access_model(user_id=obj.owner_id, role=OWNER, **{column: obj.pk})
+        for obj in objects
+    ]
+    rows += [
+        access_model(
+            user_id=user_id, role=COLLABORATOR, **{column: object_id})
+        for user_id, object_id in collaborator_pairs
+    ]
+    access_model.objects.bulk_create(rows, batch_size=1000)
+
+
+def register(model, access_model):
+    """
+    Maintain ``access_model`` rows for ``model``'s owner and collaborators.
+    """
+    field = next(
+        field for field in access_model._meta.fields
+        if field.is_relation and field.remote_field.model is model)
+    _registry[model] = (access_model, field.attname)
+    post_save.connect(sync_owner_access, sender=model)
+    m2m_changed.connect(
+        sync_collaborator_access, sender=model.collaborators.through)
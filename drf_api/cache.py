@@ -0,0 +1,209 @@
+import hashlib
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_save, pre_delete, pre_save)
+from rest_framework.response import Response
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from . import cascade
+
+# Maps each registered model to a function returning the ids of the users
+# whose cached lists may show any of the given objects
+_audiences = {}
+
+
+def enabled():
+    """
+    Whether responses are cached, which needs a cache shared by every
+    worker process. With a per-process cache, a write would only bump
+    the version seen by the process that handled it.
+    """
+    return getattr(settings, 'LIST_CACHE_ENABLED', False)
+
+
+def version_key(user_id):
+    return f'list-cache-version:{user_id}'
+
+
+def get_version(user_id):
+    """
+    Get the user's current list cache version, creating one if missing.
+
+    Versions are random tokens rather than counters, so a version that
+    was evicted can never come back and match stale entries.
+    """
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_versions(user_ids):
+    """
+    Invalidate every cached list of the given users once the current
+    transaction commits.
+
+    Bumping earlier would let a concurrent request fetch the new version
+    and cache rows read before the commit under it.
+    """
+    if not enabled():
+        return
+    versions = {version_key(user_id): uuid4().hex for user_id in user_ids}
+    if versions:
+        transaction.on_commit(lambda: cache.set_many(versions, None))
+
+
+def audience(model, object_ids):
+    """
+    Ids of the users whose lists may show any of the given objects, or
+    none at all when nothing is cached.
+    """
+    if not enabled() or not object_ids:
+        return set()
+    return set(_audiences[model](object_ids))
+
+
+def remember_audience(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler recording who could see an object before it changes.
+    """
+    if raw or instance._state.adding or instance.pk is None:
+        instance._cache_audience = set()
+    else:
+        instance._cache_audience = audience(sender, [instance.pk])
+
+
+def invalidate_saved(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler invalidating the lists of everyone who could see an
+    object before or after it was saved.
+    """
+    previous = instance.__dict__.pop('_cache_audience', set())
+    if not raw:
+        bump_versions(previous | audience(sender, [instance.pk]))
+
+
+def invalidate_deleted(sender, instance, **kwargs):
+    """
+    Signal handler invalidating the lists of everyone who can see an
+    object that is about to be deleted.
+    """
+    if cascade.in_cascade(instance):
+        return
+    bump_versions(audience(sender, [instance.pk]))
+
+
+def invalidate_collaborators(sender, instance, action, reverse, model,
+                             pk_set, **kwargs):
+    """
+    Signal handler invalidating lists when collaborators change.
+
+    Clears are handled before they happen, while the collaborators being
+    removed can still be found.
+    """
+    if not enabled() or action not in (
+            'post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        target = model
+        users = {instance.pk}
+        if action == 'pre_clear':
+            pk_set = set(sender.objects.filter(
+                user_id=instance.pk).values_list(
+                    f'{model._meta.model_name}_id', flat=True))
+        objects = pk_set
+    else:
+        target = type(instance)
+        users = set(pk_set or ())
+        objects = {instance.pk}
+    bump_versions(users | audience(target, objects))
+
+
+def register(model, audience_function):
+    """
+    Invalidate cached lists when objects of ``model`` or their
+    collaborators change.
+
+    ``audience_function`` takes a list of object ids and returns the ids
+    of the users who may see those objects in a list.
+    """
+    _audiences[model] = audience_function
+    pre_save.connect(remember_audience, sender=model)
+    post_save.connect(invalidate_saved, sender=model)
+    pre_delete.connect(invalidate_deleted, sender=model)
+    m2m_changed.connect(
+        invalidate_collaborators, sender=model.collaborators.through)
+
+
+def get_or_set_for_user(name, user_id, compute, timeout=None):
+    """
+    Get a value cached for the user, computing and caching it if missing.
+
+    The value is dropped whenever the user's lists are invalidated, so
+    it must only depend on projects and tasks the user can see and on
+    whatever is part of ``name``. Without a shared cache the value is
+    computed every time.
+    """
+    if not enabled():
+        return compute()
+    key = f'user-cache:{name}:{user_id}:{get_version(user_id)}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout or getattr(
+            settings, 'LIST_CACHE_TIMEOUT', 300))
+    return value
+
+
+def to_plain(data):
+    """
+    Convert serializer output into plain containers that can be pickled
+    by any cache backend.
+    """
+    if isinstance(data, (ReturnList, list)):
+        return [to_plain(item) for item in data]
+    if isinstance(data, ReturnDict):
+        return {key: to_plain(value) for key, value in data.items()}
+    if isinstance(data, dict):
+        return type(data)(
+            (key, to_plain(value)) for key, value in data.items())
+    return data
+
+
+class CachedListMixin:
+    """
+    Cache a list view's serialized response per user.
+
+    Entries are keyed by the view, the full request URL and the user's
+    list cache version, which is bumped whenever anything the user can
+    see changes. Responses are not cached unless the cache is shared
+    between worker processes.
+    """
+    list_cache_timeout = getattr(settings, 'LIST_CACHE_TIMEOUT', 300)
+
+    def get_list_cache_key(self, request):
+        user_id = request.user.pk
+        url = hashlib.md5(
+            request.build_absolute_uri().encode('utf-8'),
+            usedforsecurity=False).hexdigest()
+        return (
+            f'list-cache:{type(self).__name__}:{user_id}:'
+            f'{get_version(user_id)}:{url}'
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not enabled():
+            return super().list(request, *args, **kwargs)
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            cache.set(key, to_plain(response.data), self.list_cache_timeout)
+            return response
+        return Response(data)
@@ -0,0 +1,59 @@
+import threading
+from contextlib import contextmanager
+
+# Maps each registered model to its parent model and foreign key column
+_registry = {}
+_local = threading.local()
+
+
+def deleting_ids(model):
+    """
+    Ids of the ``model`` objects being deleted in this thread.
+    """
+    return getattr(_local, 'deleting', {}).get(model, frozenset())
+
+
+@contextmanager
+def deleting(model, object_ids):
+    """
+    Mark ``model`` objects as being deleted for the duration of the
+    block.
+
+    Wraps the deletion of parent objects, so the delete signal handlers
+    of their registered children can leave their work to a handler that
+    does it once for all the children.
+    """
+    marked = getattr(_local, 'deleting', None)
+    if marked is None:
+        marked = _local.deleting = {}
+    previous = marked.get(model, frozenset())
+    marked[model] = previous | set(object_ids)
+    try:
+        yield
+    finally:
+        marked[model] = previous
+
+
+def in_cascade(instance):
+    """
+    Whether ``instance`` is being deleted along with its parent, in which
+    case its own delete handlers should do nothing.
+    """
+    entry = _registry.get(type(instance))
+    if entry is None:
+        return False
+    parent_model, column = entry
+    return getattr(instance, column) in deleting_ids(parent_model)
+
+
+def register(model, parent_field):
+    """
+    Let ``model`` objects deleted with their ``parent_field`` parent skip
+    their per-object delete handlers.
+
+    The parent must be deleted inside ``deleting()``, and something must
+    do the skipped work for all the children at once, typically a
+    ``pre_delete`` handler on the parent.
+    """
+    field = model._meta.get_field(parent_field)
+    _registry[model] = (field.remote_field.model, field.attname)
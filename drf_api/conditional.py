@@ -0,0 +1,49 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """
+    Build a quoted ETag from the values a representation depends on.
+    """
+    digest = hashlib.md5(
+        '|'.join(str(part) for part in parts).encode('utf-8'),
+        usedforsecurity=False)
+    return quote_etag(digest.hexdigest())
+
+
+def collaborator_ids(obj):
+    """
+    Sorted ids of an object's collaborators, from the prefetched
+    collaborators when available and otherwise from the through table.
+    """
+    prefetched = getattr(obj, '_prefetched_objects_cache', {})
+    if 'collaborators' in prefetched:
+        return sorted(
+            collaborator.pk for collaborator in prefetched['collaborators'])
+    return sorted(obj.collaborators.values_list('pk', flat=True))
+
+
+def not_modified(request, etag, last_modified):
+    """
+    Return a 304 response if the request's conditional headers match the
+    given validators, otherwise None.
+
+    ``last_modified`` is a timezone-aware datetime.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Add ETag and Last-Modified headers to a response.
+    """
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,170 @@
+import csv
+from datetime import date, datetime
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework import permissions, renderers, serializers
+from rest_framework.views import APIView
+
+from .renderers import FastJSONRenderer
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """
+    Renders newline-delimited JSON, one object per line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(
+            FastJSONRenderer().render(row) + b'\n' for row in rows)
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """
+    Renders a list of flat objects as CSV with a header row.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        fieldnames = list(rows[0]) if rows else []
+        return ''.join(write_csv(fieldnames, rows))
+
+
+class Echo:
+    """
+    File-like object that returns what is written to it, so csv.writer
+    can produce one line at a time.
+    """
+    def write(self, value):
+        return value
+
+
+def write_csv(fieldnames, rows):
+    """
+    Yield the CSV lines for ``rows``, starting with a header row.
+
+    List values are joined with semicolons.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(fieldnames)
+    for row in rows:
+        yield writer.writerow([
+            ';'.join(str(item) for item in row[name])
+            if isinstance(row[name], list) else row[name]
+            for name in fieldnames
+        ])
+
+
+def chunks(iterable, size):
+    """
+    Split an iterable into lists of at most ``size`` items.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ExportView(APIView):
+    """
+    Stream every row of a queryset as NDJSON or CSV.
+
+    The format is chosen with ``?format=ndjson`` or ``?format=csv`` or
+    the Accept header, and defaults to NDJSON. Rows are read with
+    ``QuerySet.iterator()`` and written as they are produced, so memory
+    use does not grow with the number of rows.
+
+    Subclasses set ``queryset``, ``export_fields`` and ``filename``. The
+    queryset's ``accessible_to()`` limits the rows to those the user can
+    access. ``export_sources`` maps export fields to differently named
+    values, such as ``{'owner': 'owner__username'}``. A
+    ``collaborators`` export field is filled with collaborator ids,
+    loaded with one query per chunk.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    queryset = None
+    export_fields = ()
+    export_sources = {}
+    filename = 'export'
+    chunk_size = 2000
+
+    date_field = serializers.DateField()
+    datetime_field = serializers.DateTimeField()
+
+    def get_queryset(self):
+        """
+        The rows the user can access, in id order, as plain values.
+        """
+        names = ['id'] + [
+            self.export_sources.get(name, name)
+            for name in self.export_fields
+            if name not in ('id', 'collaborators')
+        ]
+        return self.queryset.accessible_to(self.request.user).order_by(
+            'pk').values(*names)
+
+    def format_value(self, value):
+        """
+        Format dates and datetimes as the API does.
+        """
+        if isinstance(value, datetime):
+            return self.datetime_field.to_representation(value)
+        if isinstance(value, date):
+            return self.date_field.to_representation(value)
+        return value
+
+    def prepare_chunk(self, queryset, chunk):
+        """
+        Turn a chunk of value dicts into export rows.
+        """
+        if 'collaborators' in self.export_fields:
+            through = queryset.model.collaborators.through
+            column = f'{queryset.model._meta.model_name}_id'
+            collaborators = {row['id']: [] for row in chunk}
+            pairs = through.objects.filter(**{
+                f'{column}__in': list(collaborators)
+            }).order_by(column, 'user_id').values_list(column, 'user_id')
+            for object_id, user_id in pairs:
+                collaborators[object_id].append(user_id)
+            for row in chunk:
+                row['collaborators'] = collaborators[row['id']]
+
+        return [{
+            name: self.format_value(row[self.export_sources.get(name, name)])
+            for name in self.export_fields
+        } for row in chunk]
+
+    def get_rows(self):
+        """
+        Yield export rows, reading the queryset in chunks.
+        """
+        queryset = self.get_queryset()
+        rows = queryset.iterator(chunk_size=self.chunk_size)
+        for chunk in chunks(rows, self.chunk_size):
+            yield from self.prepare_chunk(queryset, chunk)
+
+    def get(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        rows = self.get_rows()
+        if renderer.format == 'csv':
+            content = write_csv(self.export_fields, rows)
+            content_type = f'{renderer.media_type}; charset={renderer.charset}'
+        else:
+            json_renderer = FastJSONRenderer()
+            content = (json_renderer.render(row) + b'\n' for row in rows)
+            content_type = renderer.media_type
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.filename}.{renderer.format}"')
+        return response
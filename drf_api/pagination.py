@@ -0,0 +1,142 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def client_page_size(request, query_param, default, maximum):
+    """
+    Page size the client asked for with ``query_param``, up to
+    ``maximum``, or ``default`` if it asked for none or an invalid one.
+    """
+    try:
+        page_size = int(request.query_params[query_param])
+        if page_size > 0:
+            return min(page_size, maximum)
+    except (KeyError, ValueError):
+        pass
+    return default
+
+
+def encode_position(*values):
+    """
+    Encode the values marking a position as an opaque cursor string.
+    """
+    position = '|'.join(str(value) for value in values)
+    return urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+
+def decode_position(encoded, length, message):
+    """
+    Decode a cursor string into its ``length`` values, as strings.
+
+    Raises NotFound with ``message`` if it was not made by
+    ``encode_position``.
+    """
+    try:
+        values = urlsafe_b64decode(
+            encoded.encode('ascii')).decode('ascii').split('|')
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound(message)
+    if len(values) != length:
+        raise NotFound(message)
+    return values
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset (cursor) mode.
+
+    Requests that include a ``cursor`` query parameter (empty for the first
+    page) are paginated on ``(created_at, id)``, newest first. Each page
+    seeks straight to its position through the ``created_at``/``id`` index
+    and no COUNT is run, so deep pages cost the same as the first one.
+    The ``ordering`` parameter is ignored in cursor mode.
+
+    All other requests fall back to the default page number pagination.
+    """
+    cursor_query_param = 'cursor'
+    cursor_page_size = 10
+    cursor_page_size_query_param = 'page_size'
+    cursor_max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_cursor_page_size(request)
+        queryset = queryset.order_by('-created_at', '-id')
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) |
+                Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to find out whether a next page exists
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.cursor_page = results[:page_size]
+        return self.cursor_page
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        last = self.cursor_page[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(last))
+
+    def get_cursor_page_size(self, request):
+        """
+        Page size for cursor mode, optionally set by the client.
+        """
+        return client_page_size(
+            request, self.cursor_page_size_query_param,
+            self.cursor_page_size, self.cursor_max_page_size)
+
+    def encode_cursor(self, obj):
+        """
+        Encode the position of an object as an opaque cursor string.
+        """
+        return encode_position(obj.created_at.isoformat(), obj.pk)
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor from the request into ``(created_at, id)``.
+
+        Returns None for the first page.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        created_at, pk = decode_position(
+            encoded, 2, self.invalid_cursor_message)
+        try:
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
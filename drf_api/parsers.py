@@ -0,0 +1,48 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework import parsers
+
+from .renderers import FastJSONRenderer, orjson
+
+# Maps every digit to b'0' and every other byte to a space, so runs of
+# digits can be found with a plain substring search, which is much
+# faster than a regular expression on large bodies
+DIGITS = bytes(
+    0x30 if 0x30 <= byte <= 0x39 else 0x20 for byte in range(256))
+
+# A run of digits long enough to be an integer orjson cannot hold in
+# 64 bits, which it would parse as a float
+LONG_NUMBER = b'0' * 19
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSON parser using orjson when it is installed.
+
+    Bodies orjson rejects are handed to JSONParser, so anything the
+    standard parser accepts is still accepted and parse errors read the
+    same. orjson parses integers beyond 64 bits as floats, so bodies
+    with 19 or more digits in a row are parsed by JSONParser too, which
+    keeps such integers exact.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parses the incoming bytestream as JSON and returns the resulting data.
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if (orjson is None or not self.strict or
+                codecs.lookup(encoding).name != 'utf-8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_NUMBER in body.translate(DIGITS):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -1,4 +1,5 @@
 from rest_framework import permissions
+from .access import request_has_access
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -8,7 +9,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.owner == request.user
+        return obj.owner_id == request.user.pk
 
 
 class IsSenderOrReceiver(permissions.BasePermission):
@@ -17,7 +18,7 @@ class IsSenderOrReceiver(permissions.BasePermission):
     has object permission on this object.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.sender or request.user == obj.receiver
+        return request.user.pk in (obj.sender_id, obj.receiver_id)
 
 
 class IsOwnerOrCollaborator(permissions.BasePermission):
@@ -31,11 +32,7 @@ class IsOwnerOrCollaborator(permissions.BasePermission):
         return request.user and request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        if request.user == obj.owner:
-            return True
-        elif request.user in obj.collaborators.all():
-            return True
-        return False
+        return request_has_access(request, obj)
 
 
 class IsOwnerOrCollaboratorReadOnly(permissions.BasePermission):
@@ -44,9 +41,6 @@ class IsOwnerOrCollaboratorReadOnly(permissions.BasePermission):
     but only the owner may edit or delete it.
     """
     def has_object_permission(self, request, view, obj):
-        if (
-            request.method in permissions.SAFE_METHODS
-            and request.user in obj.collaborators.all()
-        ):
-            return True
-        return obj.owner == request.user
+        if request.method in permissions.SAFE_METHODS:
+            return request_has_access(request, obj)
+        return obj.owner_id == request.user.pk
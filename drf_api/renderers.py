@@ -0,0 +1,71 @@
+import math
+from decimal import Decimal
+
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def has_non_finite_float(data):
+    """
+    Whether ``data`` holds a NaN or infinite float at any depth.
+    """
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, Decimal):
+        return not data.is_finite()
+    if isinstance(data, dict):
+        return any(
+            has_non_finite_float(key) or has_non_finite_float(value)
+            for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return any(has_non_finite_float(item) for item in data)
+    return False
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSON renderer using orjson when it is installed.
+
+    Output matches JSONRenderer's compact unicode output, except that
+    floats may use a shorter exponent form, such as ``1e16`` for
+    ``1e+16``, which parses to the same value. Indented output, payloads
+    orjson cannot encode (such as integers beyond 64 bits) and every
+    payload when orjson is missing are rendered by JSONRenderer.
+
+    orjson writes NaN and infinity as ``null``, so payloads holding them
+    are also rendered by JSONRenderer, which raises ValueError for them
+    in strict mode.
+    """
+    options = 0 if orjson is None else (
+        orjson.OPT_NON_STR_KEYS |
+        orjson.OPT_PASSTHROUGH_DATETIME |
+        orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if (orjson is None or data is None or self.ensure_ascii or
+                not self.compact or not self.strict or self.get_indent(
+                    accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Dates and other types orjson would format itself are passed
+            # through to the standard encoder so they render identically
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in ret and has_non_finite_float(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape the line and paragraph separators as JSONRenderer does
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
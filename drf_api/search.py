@@ -0,0 +1,196 @@
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector)
+from django.db import connection
+from django.db.models import F, FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from . import cascade
+
+
+class PostgresSearchBackend:
+    """
+    Full-text search on a ``search_vector`` tsvector column with a GIN index.
+
+    Title matches are weighted above summary matches.
+    """
+    config = 'english'
+
+    def vector(self):
+        return (
+            SearchVector('title', weight='A', config=self.config) +
+            SearchVector('summary', weight='B', config=self.config)
+        )
+
+    def index(self, model, pk):
+        self.index_many(model, [pk])
+
+    def index_many(self, model, pks):
+        model._base_manager.filter(pk__in=pks).update(
+            search_vector=self.vector())
+
+    def remove(self, model, pk):
+        # The vector lives on the row itself and is deleted with it
+        pass
+
+    def remove_many(self, model, pks):
+        pass
+
+    def rebuild(self, model):
+        model._base_manager.update(search_vector=self.vector())
+
+    def query_expression(self, terms):
+        """
+        Quote each search term as a prefix lexeme, so partial words match
+        as the user types and their input is never parsed as tsquery
+        syntax. Terms are combined with AND.
+        """
+        return ' & '.join(
+            "'{}':*".format(term.replace('\\', '\\\\').replace("'", "''"))
+            for term in terms.split())
+
+    def search(self, queryset, terms):
+        expression = self.query_expression(terms)
+        if not expression:
+            return queryset.none()
+        query = SearchQuery(
+            expression, config=self.config, search_type='raw')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query))
+
+
+class SQLiteSearchBackend:
+    """
+    Full-text search on an FTS5 shadow table used in development.
+
+    The shadow table is named ``<db_table>_fts`` and keyed by the rowid of
+    the indexed object.
+    """
+
+    def table(self, model):
+        return f'{model._meta.db_table}_fts'
+
+    def index(self, model, pk):
+        self.index_many(model, [pk])
+
+    def index_many(self, model, pks, batch_size=500):
+        pks = list(pks)
+        table = self.table(model)
+        with connection.cursor() as cursor:
+            # Batched to stay under SQLite's bound parameter limit
+            for start in range(0, len(pks), batch_size):
+                batch = pks[start:start + batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {table} WHERE rowid IN ({placeholders})',
+                    batch)
+                cursor.execute(
+                    f'INSERT INTO {table} (rowid, title, summary) '
+                    f'SELECT id, title, summary FROM {model._meta.db_table} '
+                    f'WHERE id IN ({placeholders})', batch)
+
+    def remove(self, model, pk):
+        self.remove_many(model, [pk])
+
+    def remove_many(self, model, pks, batch_size=500):
+        pks = list(pks)
+        with connection.cursor() as cursor:
+            for start in range(0, len(pks), batch_size):
+                batch = pks[start:start + batch_size]
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {self.table(model)} '
+                    f'WHERE rowid IN ({placeholders})', batch)
+
+    def rebuild(self, model):
+        table = self.table(model)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table}')
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, title, summary) '
+                f'SELECT id, title, summary FROM {model._meta.db_table}')
+
+    def match_expression(self, terms):
+        """
+        Quote each search term as a prefix query, so partial words match
+        as the user types and their input is never parsed as FTS5 query
+        syntax. Terms are combined with AND.
+        """
+        return ' '.join(
+            '"{}"*'.format(term.replace('"', '""')) for term in terms.split())
+
+    def search(self, queryset, terms):
+        match = self.match_expression(terms)
+        if not match:
+            return queryset.none()
+        table = self.table(queryset.model)
+        db_table = queryset.model._meta.db_table
+        # bm25() is lower for better matches, so negate it for the rank
+        return queryset.filter(
+            id__in=RawSQL(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [match])
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -bm25({table}) FROM {table} '
+            f'WHERE {table} MATCH %s AND rowid = {db_table}.id',
+            [match], output_field=FloatField()))
+
+
+def get_search_backend():
+    """
+    Return the search backend for the default database.
+    """
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return SQLiteSearchBackend()
+
+
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """
+    Signal handler re-indexing an object after it is saved.
+    """
+    if not raw:
+        get_search_backend().index(sender, instance.pk)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    """
+    Signal handler removing a deleted object from the search index.
+    """
+    if cascade.in_cascade(instance):
+        return
+    get_search_backend().remove(sender, instance.pk)
+
+
+def register(model):
+    """
+    Keep the search index of a model up to date as objects are saved
+    and deleted.
+    """
+    post_save.connect(update_search_index, sender=model)
+    post_delete.connect(remove_from_search_index, sender=model)
+
+
+class FullTextSearchFilter(filters.BaseFilterBackend):
+    """
+    Filter a registered model by the ``search`` query parameter using the
+    full-text index on its title and summary.
+
+    Results are ordered by relevance unless the client asks for an
+    explicit ordering.
+    """
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        if not terms:
+            return queryset
+
+        queryset = get_search_backend().search(queryset, terms)
+        if self.ordering_param not in request.query_params:
+            ordering = (
+                queryset.query.order_by or queryset.model._meta.ordering)
+            queryset = queryset.order_by('-search_rank', *ordering)
+        return queryset
@@ -1,5 +1,40 @@
 from dj_rest_auth.serializers import UserDetailsSerializer
-from rest_framework import serializers
+from rest_framework import permissions, serializers
+
+
+def requested_fields(request, field_names):
+    """
+    Get the subset of field_names a read request asks for.
+
+    Clients may list the fields they want with ``?fields=a,b`` and/or
+    the fields they do not want with ``?omit=c,d``. Write requests always
+    get every field.
+    """
+    fields = set(field_names)
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return fields
+
+    wanted = request.query_params.get('fields')
+    if wanted:
+        fields &= {name.strip() for name in wanted.split(',')}
+    omitted = request.query_params.get('omit')
+    if omitted:
+        fields -= {name.strip() for name in omitted.split(',')}
+    return fields
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin dropping the fields a read request did not ask for,
+    so their method fields and related lookups never run.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        keep = requested_fields(request, self.fields)
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
 
 
 class CurrentUserSerializer(UserDetailsSerializer):
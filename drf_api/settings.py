@@ -35,11 +35,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'DATETIME_FORMAT': '%d %b %Y',
     'DATE_FORMAT': '%d %b %Y',
+    'DEFAULT_PARSER_CLASSES': [
+        'drf_api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 if 'DEV' not in os.environ:
     REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
-        'rest_framework.renderers.JSONRenderer',
+        'drf_api.renderers.FastJSONRenderer',
     ]
 
 REST_USE_JWT = True
@@ -143,6 +148,11 @@ if 'DEV' in os.environ:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # A file rather than shared-cache memory, so tests that run
+            # queries from several threads wait on locks instead of failing
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
         }
     }
 else:
@@ -150,6 +160,64 @@ else:
         'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
     }
 
+# Caching
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# List and dashboard caching relies on every worker process seeing the same
+# cache, so it is only turned on with a shared backend: memcached
+# (MEMCACHED_LOCATION, needs pymemcache), a database table (CACHE_TABLE,
+# created by createcachetable) or a directory on a single host (CACHE_DIR).
+# The development server runs in one process, so local memory will do.
+
+if 'MEMCACHED_LOCATION' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ.get('MEMCACHED_LOCATION'),
+        }
+    }
+elif 'CACHE_TABLE' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.environ.get('CACHE_TABLE'),
+        }
+    }
+elif 'CACHE_DIR' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR'),
+        }
+    }
+elif 'DEV' in os.environ:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    }
+
+# Whether list and dashboard responses are cached, see drf_api.cache
+LIST_CACHE_ENABLED = (
+    CACHES['default']['BACKEND'] !=
+    'django.core.cache.backends.dummy.DummyCache'
+)
+
+# Seconds a cached list response is kept, see drf_api.cache
+LIST_CACHE_TIMEOUT = 300
+
+# Days of deletions kept for the sync endpoint, see drf_api.sync
+SYNC_TOMBSTONE_DAYS = 30
+
+# Seconds sync cursors trail the start of the sync, which must exceed the
+# longest write transaction, see drf_api.sync
+SYNC_CURSOR_MARGIN = 60
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
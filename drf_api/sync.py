@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, pre_delete
+from django.utils import timezone
+
+from . import access, cascade
+
+# Maps each registered model to its tombstone model
+_registry = {}
+
+
+def retention():
+    """
+    How long tombstones are kept. Clients that last synced longer ago
+    than this must start again from a full sync.
+    """
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_DAYS', 30))
+
+
+def cursor_margin():
+    """
+    How far a sync's cursor trails the time the sync started.
+
+    ``updated_at`` is set before a write commits, so a change can become
+    visible after a sync that started later than its ``updated_at`` has
+    read the database. Starting the next sync from an earlier time picks
+    such changes up, at the cost of sending some objects twice.
+    """
+    return timedelta(seconds=getattr(settings, 'SYNC_CURSOR_MARGIN', 60))
+
+
+def record(model, pairs):
+    """
+    Record that users can no longer see objects.
+
+    ``pairs`` holds ``(user_id, object_id)`` tuples.
+    """
+    tombstone_model = _registry[model]
+    tombstone_model.objects.bulk_create([
+        tombstone_model(user_id=user_id, object_id=object_id)
+        for user_id, object_id in pairs
+    ], batch_size=1000)
+
+
+def removed_since(model, user, since):
+    """
+    Ids of the ``model`` objects the user lost sight of since ``since``.
+    """
+    return set(_registry[model].objects.filter(
+        user_id=user.pk, deleted_at__gte=since
+    ).values_list('object_id', flat=True))
+
+
+def prune(before):
+    """
+    Delete every tombstone recorded before ``before``.
+
+    Returns the number of tombstones deleted.
+    """
+    return sum(
+        tombstone_model.objects.filter(deleted_at__lt=before).delete()[0]
+        for tombstone_model in _registry.values())
+
+
+def without_access(model, pairs):
+    """
+    The ``(user_id, object_id)`` pairs whose user has no access row left.
+    """
+    if not pairs:
+        return []
+    access_model, column = access._registry[model]
+    remaining = set(access_model.objects.filter(
+        user_id__in={user_id for user_id, _ in pairs},
+        **{f'{column}__in': {object_id for _, object_id in pairs}}
+    ).values_list('user_id', column))
+    return [pair for pair in pairs if pair not in remaining]
+
+
+def record_deleted(sender, instance, **kwargs):
+    """
+    Signal handler recording a tombstone for every user who could see an
+    object that is about to be deleted.
+    """
+    if cascade.in_cascade(instance):
+        return
+    access_model, column = access._registry[sender]
+    user_ids = access_model.objects.filter(
+        **{column: instance.pk}).values_list('user_id', flat=True).distinct()
+    record(sender, [(user_id, instance.pk) for user_id in user_ids])
+
+
+def record_deleted_many(model, object_ids):
+    """
+    Record tombstones for every user who could see any of the given
+    objects, which are about to be deleted together.
+    """
+    access_model, column = access._registry[model]
+    record(model, access_model.objects.filter(
+        **{f'{column}__in': object_ids}
+    ).values_list('user_id', column).distinct())
+
+
+def record_collaborator_changes(sender, instance, action, reverse, model,
+                                pk_set, **kwargs):
+    """
+    Signal handler for collaborator changes.
+
+    Marks the changed objects as updated, so sync picks them up for
+    every user who can see them, including new collaborators. Records
+    tombstones for removed collaborators who no longer have access.
+
+    The collaborators being cleared are remembered before a clear, while
+    they can still be found.
+    """
+    target = model if reverse else type(instance)
+    column = f'{target._meta.model_name}_id'
+    if action == 'pre_clear':
+        if reverse:
+            cleared = sender.objects.filter(
+                user_id=instance.pk).values_list(column, flat=True)
+        else:
+            cleared = sender.objects.filter(
+                **{column: instance.pk}).values_list('user_id', flat=True)
+        instance._sync_cleared = set(cleared)
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_sync_cleared', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if not pk_set:
+        return
+
+    if reverse:
+        object_ids = set(pk_set)
+        pairs = [(instance.pk, object_id) for object_id in pk_set]
+    else:
+        object_ids = {instance.pk}
+        pairs = [(user_id, instance.pk) for user_id in pk_set]
+
+    target._base_manager.filter(pk__in=object_ids).update(
+        updated_at=timezone.now())
+    if action != 'post_add':
+        record(target, without_access(target, pairs))
+
+
+def register(model, tombstone_model):
+    """
+    Record ``tombstone_model`` rows for users who can no longer see
+    ``model`` objects, because they were deleted or the user was removed
+    as a collaborator.
+
+    Must be registered after ``access.register``, so the access table is
+    already up to date when collaborator changes are handled.
+    """
+    _registry[model] = tombstone_model
+    pre_delete.connect(record_deleted, sender=model)
+    m2m_changed.connect(
+        record_collaborator_changes, sender=model.collaborators.through)
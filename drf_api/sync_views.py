@@ -0,0 +1,175 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from projects.models import Project
+from projects.serializers import ProjectListSerializer
+from tasks.models import Task
+from tasks.serializers import TaskListSerializer
+
+from . import sync
+from .pagination import client_page_size, decode_position, encode_position
+
+
+class Sync(APIView):
+    """
+    API view returning the projects and tasks that changed since the
+    client last synced.
+
+    Pass the ``cursor`` from the previous sync as ``updated_since``.
+    Without it, or when it is older than the tombstone retention period,
+    everything the user can see is returned with ``full`` set, and the
+    client should replace its copy rather than merge.
+
+    Results are paged, projects first and then tasks. While ``next`` is
+    set, the client should follow it and keep the ``cursor`` from the
+    first page for its next sync. The cursor trails the sync by
+    ``SYNC_CURSOR_MARGIN`` so that slow writes are not missed, which
+    means objects can be sent more than once and should be applied as
+    upserts.
+
+    ``deleted`` lists the ids of projects and tasks that were deleted or
+    that the user lost access to since the cursor. It is only filled in
+    on the first page.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    page_query_param = 'page'
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_page_message = 'Invalid page'
+    stages = ('projects', 'tasks')
+    serializer_classes = {
+        'projects': ProjectListSerializer,
+        'tasks': TaskListSerializer,
+    }
+
+    def get_since(self, request):
+        """
+        Parse the ``updated_since`` query parameter.
+        """
+        value = request.query_params.get('updated_since')
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({
+                'updated_since': 'Enter the cursor from a previous sync.'})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since, timezone.utc)
+        return since
+
+    def decode_page(self, request):
+        """
+        Decode the page token into ``(cursor, stage, after)``.
+
+        Returns None for the first page.
+        """
+        encoded = request.query_params.get(self.page_query_param)
+        if not encoded:
+            return None
+        cursor, stage, after = decode_position(
+            encoded, 3, self.invalid_page_message)
+        try:
+            cursor = parse_datetime(cursor)
+            after = int(after)
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if cursor is None or stage not in self.stages:
+            raise NotFound(self.invalid_page_message)
+        return cursor, stage, after
+
+    def get_queryset(self, stage, user):
+        if stage == 'projects':
+            return Project.objects.select_related(
+                'owner__profile'
+            ).prefetch_related(
+                'collaborators'
+            ).accessible_to(user)
+        return Task.objects.select_related(
+            'owner', 'project'
+        ).prefetch_related(
+            'collaborators'
+        ).accessible_to(user)
+
+    def get_deleted(self, model, user, since):
+        """
+        Ids of objects of ``model`` the user lost since ``since``.
+        """
+        removed = sync.removed_since(model, user, since)
+        if not removed:
+            return []
+        # Objects that were lost and then regained are sent as changed
+        regained = model.objects.accessible_to(user).filter(
+            updated_at__gte=since, pk__in=removed
+        ).values_list('pk', flat=True)
+        return sorted(removed - set(regained))
+
+    def get(self, request):
+        """
+        Handle sync requests.
+        """
+        since = self.get_since(request)
+        position = self.decode_page(request)
+        if position is None:
+            cursor = timezone.now() - sync.cursor_margin()
+            stage, after = self.stages[0], 0
+        else:
+            cursor, stage, after = position
+        if since is not None and since < cursor - sync.retention():
+            since = None
+
+        user = request.user
+        context = {'request': request}
+        data = {'projects': [], 'tasks': []}
+        remaining = client_page_size(
+            request, self.page_size_query_param, self.page_size,
+            self.max_page_size)
+        next_page = None
+        for stage in self.stages[self.stages.index(stage):]:
+            queryset = self.get_queryset(stage, user)
+            if since is not None:
+                queryset = queryset.filter(updated_at__gte=since)
+            # Fetch one extra row to find out whether more are left
+            results = list(
+                queryset.filter(pk__gt=after).order_by('pk')[:remaining + 1])
+            page = results[:remaining]
+            data[stage] = self.serializer_classes[stage](
+                page, many=True, context=context).data
+            remaining -= len(page)
+            if len(results) > len(page):
+                next_page = (stage, page[-1].pk)
+                break
+            after = 0
+            if not remaining:
+                later = self.stages[self.stages.index(stage) + 1:]
+                if later:
+                    next_page = (later[0], after)
+                break
+
+        deleted = {'projects': [], 'tasks': []}
+        if since is not None and position is None:
+            deleted['projects'] = self.get_deleted(Project, user, since)
+            deleted['tasks'] = self.get_deleted(Task, user, since)
+
+        next_link = None
+        if next_page is not None:
+            next_link = replace_query_param(
+                request.build_absolute_uri(), self.page_query_param,
+                encode_position(cursor.isoformat(), *next_page))
+
+        return Response({
+            'cursor': cursor.astimezone(timezone.utc).strftime(
+                '%Y-%m-%dT%H:%M:%S.%fZ'),
+            'full': since is None,
+            'projects': data['projects'],
+            'tasks': data['tasks'],
+            'deleted': deleted,
+            'next': next_link,
+        })
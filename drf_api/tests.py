@@ -0,0 +1,198 @@
+import io
+import math
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from projects.models import Project
+from tasks.models import Task
+
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .search import PostgresSearchBackend
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = {'id': 1, 'title': 'Tâche “1” ', 'done': None,
+                'ratio': 0.5, 'tags': ['a', 'b'], 2: True}
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_non_finite_floats_raise_like_json_renderer(self):
+        for value in (math.nan, math.inf, -math.inf, Decimal('NaN')):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({'value': [value]})
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render({'value': [value]})
+
+    def test_null_still_renders(self):
+        self.assertEqual(
+            FastJSONRenderer().render({'value': None}), b'{"value":null}')
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, parser, body):
+        return parser.parse(io.BytesIO(body))
+
+    def test_matches_json_parser(self):
+        body = '{"id":1,"title":"Tâche","ratio":0.5,"tags":[]}'.encode()
+        self.assertEqual(
+            self.parse(FastJSONParser(), body),
+            self.parse(JSONParser(), body))
+
+    def test_wide_integers_stay_exact(self):
+        for number in (2 ** 64, -(2 ** 63) - 1, 10 ** 30):
+            with self.subTest(number=number):
+                body = f'{{"value":{number}}}'.encode()
+                parsed = self.parse(FastJSONParser(), body)
+                self.assertEqual(parsed, self.parse(JSONParser(), body))
+                self.assertIsInstance(parsed['value'], int)
+                self.assertEqual(parsed['value'], number)
+
+
+@override_settings(SYNC_CURSOR_MARGIN=0)
+class SyncTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.user = User.objects.create_user('user')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.projects = [
+            Project.objects.create(
+                owner=self.owner, title=f'Project {i}', summary='',
+                due_date='2030-01-01')
+            for i in range(3)
+        ]
+        self.tasks = [
+            Task.objects.create(
+                owner=self.owner, project=self.projects[0],
+                title=f'Task {i}', summary='', due_date='2030-01-01')
+            for i in range(4)
+        ]
+        for obj in self.projects + self.tasks:
+            obj.collaborators.add(self.user)
+
+    def sync(self, **params):
+        """
+        Follow every page of a sync and return the pages.
+        """
+        response = self.client.get('/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        pages = [response.json()]
+        while pages[-1]['next']:
+            response = self.client.get(pages[-1]['next'])
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.json())
+        return pages
+
+    def ids(self, pages, key):
+        return [obj['id'] for page in pages for obj in page[key]]
+
+    def test_full_sync_pages_through_everything_once(self):
+        for page_size in (1, 3, 4, 7, 500):
+            with self.subTest(page_size=page_size):
+                pages = self.sync(page_size=page_size)
+                self.assertTrue(all(page['full'] for page in pages))
+                self.assertEqual(
+                    self.ids(pages, 'projects'),
+                    [project.pk for project in self.projects])
+                self.assertEqual(
+                    self.ids(pages, 'tasks'),
+                    [task.pk for task in self.tasks])
+                self.assertEqual(
+                    len({page['cursor'] for page in pages}), 1)
+                self.assertIsNone(pages[-1]['next'])
+
+    def test_updated_since_returns_only_changes(self):
+        cursor = self.sync()[0]['cursor']
+        task = self.tasks[2]
+        task.title = 'Renamed'
+        task.save()
+
+        pages = self.sync(updated_since=cursor, page_size=1)
+        self.assertFalse(pages[0]['full'])
+        self.assertEqual(self.ids(pages, 'tasks'), [task.pk])
+        self.assertEqual(self.ids(pages, 'projects'), [])
+
+    def test_deletions_and_lost_access_are_tombstoned(self):
+        cursor = self.sync()[0]['cursor']
+        deleted_id = self.tasks[1].pk
+        self.tasks[1].delete()
+        self.projects[2].collaborators.remove(self.user)
+        self.user.tasks_collaborated.remove(self.tasks[3])
+
+        pages = self.sync(updated_since=cursor, page_size=1)
+        self.assertEqual(pages[0]['deleted'], {
+            'projects': [self.projects[2].pk],
+            'tasks': [deleted_id, self.tasks[3].pk],
+        })
+        for page in pages[1:]:
+            self.assertEqual(page['deleted'], {'projects': [], 'tasks': []})
+
+    def test_regained_access_is_sent_as_a_change(self):
+        cursor = self.sync()[0]['cursor']
+        project = self.projects[1]
+        project.collaborators.remove(self.user)
+        project.collaborators.add(self.user)
+
+        pages = self.sync(updated_since=cursor)
+        self.assertEqual(self.ids(pages, 'projects'), [project.pk])
+        self.assertEqual(pages[0]['deleted']['projects'], [])
+
+    def test_expired_cursor_gets_a_full_sync(self):
+        pages = self.sync(updated_since='2000-01-01T00:00:00Z')
+        self.assertTrue(pages[0]['full'])
+        self.assertEqual(len(self.ids(pages, 'tasks')), len(self.tasks))
+
+    @override_settings(SYNC_CURSOR_MARGIN=60)
+    def test_cursor_trails_the_sync(self):
+        cursor = self.sync()[0]['cursor']
+        pages = self.sync(updated_since=cursor)
+        self.assertEqual(len(self.ids(pages, 'tasks')), len(self.tasks))
+
+    def test_invalid_parameters(self):
+        response = self.client.get('/sync/', {'updated_since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/sync/', {'page': 'junk'})
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('user')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.kitchen = Project.objects.create(
+            owner=self.user, title='Kitchen renovation',
+            summary='New cupboards', due_date='2030-01-01')
+        Project.objects.create(
+            owner=self.user, title='Garden', summary='Plant roses',
+            due_date='2030-01-01')
+
+    def search(self, terms):
+        response = self.client.get('/projects/', {'search': terms})
+        self.assertEqual(response.status_code, 200)
+        return [project['id'] for project in response.json()]
+
+    def test_partial_words_match(self):
+        for terms in ('kitch', 'renov', 'kitchen reno', 'KITCHEN', 'cup'):
+            with self.subTest(terms=terms):
+                self.assertEqual(self.search(terms), [self.kitchen.pk])
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search('kitchen roses'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        for terms in ('"kitch', 'kitch*', 'title:kitchen OR'):
+            with self.subTest(terms=terms):
+                self.search(terms)
+
+    def test_postgres_terms_are_quoted_prefixes(self):
+        self.assertEqual(
+            PostgresSearchBackend().query_expression("kitch o'bri\\ & |"),
+            "'kitch':* & 'o''bri\\\\':* & '&':* & '|':*")
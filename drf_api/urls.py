@@ -16,6 +16,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from .views import root_route, logout_route
+from .sync_views import Sync
 
 urlpatterns = [
     path('', root_route),
@@ -30,4 +31,5 @@ urlpatterns = [
     path('', include('friends.urls')),
     path('', include('projects.urls')),
     path('', include('tasks.urls')),
+    path('sync/', Sync.as_view()),
 ]
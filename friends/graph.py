@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import m2m_changed
+
+# The FriendList model, set by register()
+_friend_list_model = None
+
+
+class AdjacencyCache:
+    """
+    In-process LRU cache of each user's friend ids.
+
+    Entries are dropped when a friendship changes in this process and
+    expire after ``timeout`` seconds, which bounds how stale they can be
+    when the change happened in another process. Only the most recently
+    used ``max_users`` users are kept, so the cache holds hot users.
+    """
+    def __init__(self, max_users=1000, timeout=60):
+        self.max_users = max_users
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id, load):
+        """
+        Get the friend ids of a user, calling ``load(user_id)`` on a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+            generation = self._generation
+
+        friend_ids = frozenset(load(user_id))
+        with self._lock:
+            # Skip storing a result that an invalidation may have outdated
+            if generation == self._generation:
+                self._entries[user_id] = (now + self.timeout, friend_ids)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_users:
+                    self._entries.popitem(last=False)
+        return friend_ids
+
+    def invalidate(self, user_ids=None):
+        """
+        Drop the given users, or every user when ``user_ids`` is None.
+        """
+        with self._lock:
+            self._generation += 1
+            if user_ids is None:
+                self._entries.clear()
+            else:
+                for user_id in user_ids:
+                    self._entries.pop(user_id, None)
+
+
+adjacency = AdjacencyCache()
+
+
+def load_friend_ids(user_id):
+    through = _friend_list_model.friends.through
+    return through.objects.filter(
+        friendlist__owner_id=user_id).values_list('user_id', flat=True)
+
+
+def friend_ids(user_id):
+    """
+    The ids of a user's friends, from the adjacency cache.
+    """
+    return adjacency.get(user_id, load_friend_ids)
+
+
+def mutual_friend_ids(user_id, other_id):
+    """
+    The ids of the friends two users have in common.
+    """
+    return friend_ids(user_id) & friend_ids(other_id)
+
+
+def suggestions(user_id, limit=20, max_friends=500):
+    """
+    Non-friends of the user ranked by how many friends they share.
+
+    Computed in one query that joins the friend list table to itself:
+    the friends of the user's friends, grouped and counted. Returns
+    ``(user_id, mutual_friends)`` pairs.
+
+    Only the user's ``max_friends`` most recent friendships are followed,
+    so the work stays bounded for users with thousands of friends.
+    """
+    through = _friend_list_model.friends.through
+    friends = through.objects.filter(friendlist__owner_id=user_id)
+    sampled = friends.order_by('-id').values('user_id')[:max_friends]
+    return list(through.objects.filter(
+        friendlist__owner_id__in=sampled
+    ).exclude(
+        user_id=user_id
+    ).exclude(
+        user_id__in=friends.values('user_id')
+    ).values('user_id').annotate(
+        mutual_friends=Count('id')
+    ).order_by('-mutual_friends', 'user_id').values_list(
+        'user_id', 'mutual_friends')[:limit])
+
+
+def invalidate(user_ids=None):
+    """
+    Drop users from the adjacency cache once the current transaction
+    commits, or every user when ``user_ids`` is None.
+    """
+    transaction.on_commit(lambda: adjacency.invalidate(user_ids))
+
+
+def invalidate_friend_lists(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    """
+    Signal handler dropping cached friend ids when a friend list changes.
+
+    Changes made from the user side, e.g. ``user.friends.add(friend_list)``,
+    touch other users' lists, so they clear the whole cache.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    invalidate(None if reverse else [instance.owner_id])
+
+
+def register(friend_list_model):
+    """
+    Keep the adjacency cache in step with ``friend_list_model``.
+
+    Code that writes the through table directly, bypassing the signal,
+    must call ``invalidate()`` itself.
+    """
+    global _friend_list_model
+    _friend_list_model = friend_list_model
+    m2m_changed.connect(
+        invalidate_friend_lists, sender=friend_list_model.friends.through)
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.23 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(fields=['-created_at', '-id'], name='friendrequest_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.23 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0002_friendrequest_friendrequest_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='friendrequest',
+            index=models.Index(fields=['sender', 'receiver', 'is_active'], name='friendrequest_pair_active_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.23 on 2026-10-18 08:14
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def deactivate_duplicates(apps, schema_editor):
+    FriendRequest = apps.get_model('friends', 'FriendRequest')
+    newer = FriendRequest.objects.filter(
+        sender=OuterRef('sender'), receiver=OuterRef('receiver'),
+        is_active=True, pk__gt=OuterRef('pk'))
+    FriendRequest.objects.filter(
+        Exists(newer), is_active=True).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('friends', '0003_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            deactivate_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='friendrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('sender', 'receiver'), name='friendrequest_unique_active_pair'),
+        ),
+    ]
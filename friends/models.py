@@ -1,7 +1,48 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Q
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
+from . import graph
+
+
+class FriendListQuerySet(models.QuerySet):
+    """
+    QuerySet with set-based helpers for changing friendships.
+    """
+    def befriend(self, user_id, other_id):
+        """
+        Add two users to each other's friend lists in one transaction.
+
+        Both sides are written with a single insert, and users who are
+        already friends are left as they are. The rows are always inserted
+        in friend list order, so concurrent inserts for the same pair wait
+        on each other instead of deadlocking.
+        """
+        with transaction.atomic():
+            lists = dict(self.filter(
+                owner_id__in=[user_id, other_id]
+            ).values_list('owner_id', 'id'))
+            if len(lists) < 2:
+                raise FriendList.DoesNotExist(
+                    'Both users need a friend list.')
+            through = FriendList.friends.through
+            through.objects.bulk_create(sorted([
+                through(friendlist_id=lists[user_id], user_id=other_id),
+                through(friendlist_id=lists[other_id], user_id=user_id),
+            ], key=lambda row: row.friendlist_id), ignore_conflicts=True)
+            graph.invalidate([user_id, other_id])
+
+    def unfriend(self, user_id, other_id):
+        """
+        Remove two users from each other's friend lists with a single
+        delete.
+        """
+        FriendList.friends.through.objects.filter(
+            Q(friendlist__owner_id=user_id, user_id=other_id) |
+            Q(friendlist__owner_id=other_id, user_id=user_id)
+        ).delete()
+        graph.invalidate([user_id, other_id])
 
 
 class FriendList(models.Model):
@@ -9,39 +50,90 @@ class FriendList(models.Model):
         User, on_delete=models.CASCADE, related_name="friend_list_owner")
     friends = models.ManyToManyField(User, blank=True, related_name="friends")
 
+    objects = FriendListQuerySet.as_manager()
+
     def __str__(self):
         return self.owner.username
 
     def add_friend(self, account):
         """
         Adds a new friend.
-        """
-        if account not in self.friends.all():
-            self.friends.add(account)
+
+        Written straight to the through table with a single
+        conflict-ignoring insert, so accounts that are already friends are
+        skipped without first reading the existing rows, as the related
+        manager does when m2m_changed has listeners.
+        """
+        through = FriendList.friends.through
+        through.objects.bulk_create(
+            [through(friendlist_id=self.pk, user_id=account.pk)],
+            ignore_conflicts=True)
+        graph.invalidate([self.owner_id])
 
     def remove_friend(self, account):
         """
         Removes a friend.
         """
-        if account in self.friends.all():
-            self.friends.remove(account)
+        self.friends.remove(account)
 
     def unfriend(self, removee):
         """
         Unfriends another user.
         """
-        remover_friends_list = self
-        remover_friends_list.remove_friend(removee)
-        removee_friends_list = FriendList.objects.get(owner=removee)
-        removee_friends_list.remove_friend(self.owner)
+        FriendList.objects.unfriend(self.owner_id, removee.pk)
 
     def is_mutual_friend(self, friend):
         """
         Determines whether user and another profile are friends.
         """
-        if friend in self.friends.all():
-            return True
-        return False
+        return self.friends.filter(pk=friend.pk).exists()
+
+
+class FriendRequestQuerySet(models.QuerySet):
+    """
+    QuerySet with helpers for looking up friendships.
+    """
+    def friendships(self, user):
+        """
+        The accepted request behind each of the user's current friends,
+        newest first, with both users and their profiles loaded.
+
+        A request is considered accepted once it is inactive. Where a pair
+        has several inactive requests, only the newest is returned.
+        """
+        friend_ids = FriendList.friends.through.objects.filter(
+            friendlist__owner=user).values('user_id')
+        newer = FriendRequest.objects.filter(
+            Q(sender=OuterRef('sender'), receiver=OuterRef('receiver')) |
+            Q(sender=OuterRef('receiver'), receiver=OuterRef('sender')),
+            is_active=False, pk__gt=OuterRef('pk'))
+        return self.filter(
+            Q(sender=user, receiver__in=friend_ids) |
+            Q(receiver=user, sender__in=friend_ids),
+            is_active=False,
+        ).filter(~Exists(newer)).select_related(
+            'sender__profile', 'receiver__profile'
+        ).order_by('-created_at', '-id')
+
+    def send_checks(self, sender_id, receiver_id):
+        """
+        Check in one query whether a friend request may be sent.
+
+        Returns a dict of flags: ``pending`` if the sender already has an
+        active request to the receiver, ``befriended`` if they are already
+        friends and ``reciprocal`` if the receiver has an active request
+        to the sender.
+        """
+        active = FriendRequest.objects.filter(is_active=True)
+        friendship = FriendList.friends.through.objects.filter(
+            friendlist__owner_id=sender_id, user_id=receiver_id)
+        return User.objects.filter(pk=receiver_id).annotate(
+            pending=Exists(active.filter(
+                sender_id=sender_id, receiver_id=receiver_id)),
+            befriended=Exists(friendship),
+            reciprocal=Exists(active.filter(
+                sender_id=receiver_id, receiver_id=sender_id)),
+        ).values('pending', 'befriended', 'reciprocal').get()
 
 
 class FriendRequest(models.Model):
@@ -55,47 +147,78 @@ class FriendRequest(models.Model):
     is_active = models.BooleanField(blank=True, null=False, default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = FriendRequestQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='friendrequest_created_id_idx'),
+            models.Index(
+                fields=['sender', 'receiver', 'is_active'],
+                name='friendrequest_pair_active_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sender', 'receiver'], condition=Q(is_active=True),
+                name='friendrequest_unique_active_pair'),
+        ]
+
     def __str__(self):
         return self.sender.username
 
+    def deactivate(self):
+        """
+        Marks the request inactive if it is still active.
+
+        The conditional update locks only this request's row, so when
+        several responses race, the first one wins and the others find
+        nothing to change. Returns whether this call changed the request.
+        """
+        updated = FriendRequest.objects.filter(
+            pk=self.pk, is_active=True).update(is_active=False)
+        self.is_active = False
+        return bool(updated)
+
     def accept(self):
         """
         Accept a friend request
         Updates both Sender and Receiver friend lists
-        """
-        receiver_friend_list = FriendList.objects.get(owner=self.receiver)
-        if receiver_friend_list:
-            receiver_friend_list.add_friend(self.sender)
-            sender_friend_list = FriendList.objects.get(owner=self.sender)
-            if sender_friend_list:
-                sender_friend_list.add_friend(self.receiver)
-                self.is_active = False
-                self.save()
+
+        Returns False, and leaves the friend lists alone, if the request
+        was no longer active.
+        """
+        with transaction.atomic():
+            accepted = self.deactivate()
+            if accepted:
+                FriendList.objects.befriend(self.sender_id, self.receiver_id)
+        return accepted
 
     def decline(self):
         """
         Decline a friend request
         Sets 'is_active' field to False
         """
-        self.is_active = False
-        self.save()
+        return self.deactivate()
 
     def cancel(self):
         """
         Cancels a friend request
         Sets 'is_active' field to False
         """
-        self.is_active = False
-        self.save()
+        return self.deactivate()
 
     def unfriend(self):
         """
         Unfriends the users involved in this friend request.
+
+        Returns False if the request had already been removed.
         """
-        sender_list = FriendList.objects.get(owner=self.sender)
-        receiver_list = FriendList.objects.get(owner=self.receiver)
+        with transaction.atomic():
+            FriendList.objects.unfriend(self.sender_id, self.receiver_id)
+            deleted, _ = FriendRequest.objects.filter(pk=self.pk).delete()
+        return bool(deleted)
+
 
-        if sender_list and receiver_list:
-            sender_list.remove_friend(self.receiver)
-            receiver_list.remove_friend(self.sender)
-            self.delete()
+# Keep the friend adjacency cache up to date
+graph.register(FriendList)
@@ -1,11 +1,12 @@
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
+from drf_api.serializers import SparseFieldsetsMixin
 from .models import FriendList, FriendRequest
 from django.contrib.auth.models import User
-from django.db.models import Q
 
 
-class FriendListSerializer(serializers.ModelSerializer):
+class FriendListSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for FriendList model.
     """
@@ -14,38 +15,61 @@ class FriendListSerializer(serializers.ModelSerializer):
     friend_details = serializers.SerializerMethodField()
 
     def get_friend_details(self, obj):
-        """Retrieve friends and their details."""
-        friends = obj.friends.all()
-        friend_details = []
+        """
+        Retrieve friends and their details.
 
-        for friend in friends:
-            friend_request = FriendRequest.objects.filter(
-                (Q(sender=obj.owner, receiver=friend) |
-                 Q(sender=friend, receiver=obj.owner)),
-                is_active=False
-            ).first()
-
-            if friend_request:
-                friend_details.append({
-                    'username': friend.username,
-                    'id': self.get_friend_profile_id(friend_request),
-                    'friend_id': friend_request.id,
-                    'friend_image': friend.profile.image.url,
-                })
+        Built from one query over the requests that made each friendship,
+        or from the page of them passed in the context as
+        ``friendships``.
+        """
+        friendships = self.context.get('friendships')
+        if friendships is None:
+            friendships = FriendRequest.objects.friendships(obj.owner)
 
-        return friend_details
+        friend_details = []
+        for friend_request in friendships:
+            friend = (
+                friend_request.receiver
+                if friend_request.sender_id == obj.owner_id
+                else friend_request.sender)
+            friend_details.append({
+                'username': friend.username,
+                'id': friend.id,
+                'friend_id': friend_request.id,
+                'friend_image': friend.profile.image.url,
+            })
 
-    def get_friend_profile_id(self, obj):
-        """Get the friend's profile ID based on the friend request."""
-        return obj.sender.id if (
-            obj.receiver == self.context['request'].user) else obj.receiver.id
+        return friend_details
 
     class Meta:
         model = FriendList
         fields = ('owner', 'friend_details')
 
 
-class FriendDetailSerializer(serializers.ModelSerializer):
+class FriendSuggestionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for users suggested as friends.
+
+    Expects a ``mutual_friends`` mapping of user id to count in the
+    context.
+    """
+
+    profile_id = serializers.ReadOnlyField(source='profile.id')
+    profile_image = serializers.ReadOnlyField(source='profile.image.url')
+    mutual_friends = serializers.SerializerMethodField()
+
+    def get_mutual_friends(self, obj):
+        """Get the number of friends shared with the current user."""
+        return self.context['mutual_friends'][obj.pk]
+
+    class Meta:
+        model = User
+        fields = (
+            'id', 'username', 'profile_id', 'profile_image', 'mutual_friends')
+
+
+class FriendDetailSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for FriendRequest model (detail view).
     """
@@ -60,13 +84,14 @@ class FriendDetailSerializer(serializers.ModelSerializer):
 
     def get_friend_profile_id(self, obj):
         """Get the friend's profile ID based on the friend request."""
-        return obj.sender.id if (
-            obj.receiver == self.context['request'].user) else obj.receiver.id
+        return obj.sender_id if (
+            obj.receiver_id == self.context['request'].user.pk) else (
+                obj.receiver_id)
 
     def get_friend_username(self, obj):
         """Get the friend's username based on the friend request."""
         return obj.sender.username if (
-            obj.receiver == self.context['request'].user) else (
+            obj.receiver_id == self.context['request'].user.pk) else (
                 obj.receiver.username)
 
     def update(self, instance, validated_data):
@@ -111,7 +136,8 @@ class SendFriendRequestSerializer(serializers.ModelSerializer):
         return friend_request
 
 
-class FriendRequestListSerializer(serializers.ModelSerializer):
+class FriendRequestListSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for listing friend requests.
     """
@@ -173,12 +199,17 @@ class RespondToFriendRequestSerializer(serializers.ModelSerializer):
         decline = validated_data.get('decline')
 
         if cancel:
-            instance.cancel()
+            responded = instance.cancel()
         elif accept:
-            instance.accept()
+            responded = instance.accept()
         elif decline:
-            instance.decline()
+            responded = instance.decline()
+        else:
+            return instance
 
+        if not responded:
+            raise serializers.ValidationError(
+                {'detail': 'This friend request is no longer active.'})
         return instance
 
     def __init__(self, *args, **kwargs):
@@ -189,8 +220,8 @@ class RespondToFriendRequestSerializer(serializers.ModelSerializer):
 
         if instance:
             # Set read-only flags based on user's role in the friend request
-            if user == instance.sender:
+            if user.pk == instance.sender_id:
                 self.fields['accept'].read_only = True
                 self.fields['decline'].read_only = True
-            elif user == instance.receiver:
+            elif user.pk == instance.receiver_id:
                 self.fields['cancel'].read_only = True
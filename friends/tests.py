@@ -1,3 +1,69 @@
-from django.test import TestCase
+import threading
+from collections import Counter
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+
+from .models import FriendList, FriendRequest
+
+
+class ConcurrentAcceptTests(TransactionTestCase):
+    """
+    Race accepts of the same friend requests from several threads.
+
+    Each thread uses its own database connection, so the test data has to
+    be committed, which is why this is a TransactionTestCase.
+    """
+    requests = 5
+    threads = 4
+
+    def accept_in_threads(self, friend_request):
+        """
+        Accept the request from every thread at once and return the
+        results and the exceptions raised.
+        """
+        barrier = threading.Barrier(self.threads)
+        results = []
+        errors = []
+
+        def accept():
+            try:
+                own_copy = FriendRequest.objects.get(pk=friend_request.pk)
+                barrier.wait(timeout=10)
+                results.append(own_copy.accept())
+            except Exception as exc:
+                barrier.abort()
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [
+            threading.Thread(target=accept) for _ in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results, errors
+
+    def test_each_request_is_accepted_once(self):
+        friend_requests = [
+            FriendRequest.objects.create(
+                sender=User.objects.create(username=f'sender-{i}'),
+                receiver=User.objects.create(username=f'receiver-{i}'))
+            for i in range(self.requests)
+        ]
+
+        for friend_request in friend_requests:
+            results, errors = self.accept_in_threads(friend_request)
+            self.assertEqual(errors, [])
+            self.assertEqual(results.count(True), 1)
+
+        self.assertFalse(FriendRequest.objects.filter(is_active=True).exists())
+        rows = Counter(FriendList.friends.through.objects.values_list(
+            'friendlist__owner_id', 'user_id'))
+        for friend_request in friend_requests:
+            sender_id = friend_request.sender_id
+            receiver_id = friend_request.receiver_id
+            self.assertEqual(rows[sender_id, receiver_id], 1)
+            self.assertEqual(rows[receiver_id, sender_id], 1)
@@ -1,10 +1,12 @@
 from django.urls import path
-from .views import FriendListView, FriendDetailView, SendFriendRequestView, RespondToFriendRequestView, FriendRequestListView
+from .views import FriendListView, FriendDetailView, SendFriendRequestView, RespondToFriendRequestView, FriendRequestListView, FriendSuggestionsView, MutualFriendsView
 
 urlpatterns = [
     # URL patterns for friend views
     path('friends/', FriendListView.as_view(), name='friend-list'),
     path('friends/<int:pk>/', FriendDetailView.as_view(), name='friend-list'),
+    path('friends/suggestions/', FriendSuggestionsView.as_view(), name='friend-suggestions'),
+    path('friends/mutual/<int:pk>/', MutualFriendsView.as_view(), name='mutual-friends'),
     path('send-friend-request/', SendFriendRequestView.as_view(), name='send-friend-request'),
     path('friend-requests/<int:pk>/', RespondToFriendRequestView.as_view(), name='respond-to-friend-request'),
     path('friend-requests/', FriendRequestListView.as_view(), name='friend-requests'),
@@ -1,31 +1,114 @@
 from django.http import Http404
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.contrib.auth.models import User
 from .models import FriendList, FriendRequest
 from .serializers import (
     FriendListSerializer, FriendDetailSerializer, SendFriendRequestSerializer,
-    RespondToFriendRequestSerializer, FriendRequestListSerializer
+    RespondToFriendRequestSerializer, FriendRequestListSerializer,
+    FriendSuggestionSerializer
 )
+from . import graph
 from django.db.models import Q
 from rest_framework.permissions import IsAuthenticated
 from drf_api.permissions import IsSenderOrReceiver
+from drf_api.pagination import OptionalCursorPagination
+from drf_api.serializers import requested_fields
+
+
+class FriendListPagination(OptionalCursorPagination):
+    """
+    Friend lists are paginated by default, 100 friends to a page.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_page_size = 100
+    cursor_max_page_size = 500
 
 
 class FriendListView(generics.RetrieveAPIView):
     """
     Retrieve the friend list for the authenticated user.
+
+    ``friend_details`` holds one page of friends, newest first, and
+    ``next`` links to the following page.
     """
     serializer_class = FriendListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FriendListPagination
 
     def get_object(self):
         try:
-            return FriendList.objects.get(owner=self.request.user)
+            return FriendList.objects.select_related('owner').get(
+                owner=self.request.user)
         except FriendList.DoesNotExist:
             raise Http404
 
+    def retrieve(self, request, *args, **kwargs):
+        friend_list = self.get_object()
+        context = self.get_serializer_context()
+        fields = requested_fields(request, FriendListSerializer.Meta.fields)
+        next_link = None
+        if 'friend_details' in fields:
+            context['friendships'] = self.paginate_queryset(
+                FriendRequest.objects.friendships(request.user))
+            next_link = self.paginator.get_next_link()
+        serializer = self.get_serializer_class()(friend_list, context=context)
+        data = serializer.data
+        data['next'] = next_link
+        return Response(data)
+
+
+class FriendSuggestionsView(generics.ListAPIView):
+    """
+    List users the authenticated user may know, ranked by the number of
+    friends they share.
+    """
+    serializer_class = FriendSuggestionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+    default_limit = 20
+    max_limit = 50
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params['limit'])
+            if limit > 0:
+                return min(limit, self.max_limit)
+        except (KeyError, ValueError):
+            pass
+        return self.default_limit
+
+    def list(self, request, *args, **kwargs):
+        ranked = graph.suggestions(request.user.pk, limit=self.get_limit())
+        users = User.objects.select_related('profile').in_bulk(
+            [user_id for user_id, _ in ranked])
+        context = self.get_serializer_context()
+        context['mutual_friends'] = dict(ranked)
+        serializer = self.get_serializer_class()(
+            [users[user_id] for user_id, _ in ranked if user_id in users],
+            many=True, context=context)
+        return Response(serializer.data)
+
+
+class MutualFriendsView(APIView):
+    """
+    Count the friends the authenticated user shares with another user.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        mutual = graph.mutual_friend_ids(request.user.pk, pk)
+        return Response({
+            'user': pk,
+            'mutual_friends': len(mutual),
+            'ids': sorted(mutual),
+        })
+
 
 class FriendDetailView(generics.RetrieveUpdateAPIView):
     """
@@ -37,7 +120,9 @@ class FriendDetailView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         friend_request_id = self.kwargs['pk']
         try:
-            friend_request = FriendRequest.objects.get(
+            friend_request = FriendRequest.objects.select_related(
+                'sender', 'receiver'
+            ).get(
                 Q(sender=self.request.user) | Q(receiver=self.request.user),
                 id=friend_request_id
             )
@@ -60,33 +145,34 @@ class SendFriendRequestView(generics.CreateAPIView):
         receiver = serializer.validated_data['receiver']
         sender = self.request.user
 
-        # Checks if friend request to this user already exists
-        existing_request = FriendRequest.objects.filter(
-            sender=sender, receiver=receiver, is_active=True)
-        if existing_request.exists():
+        # Check every precondition with a single query
+        checks = FriendRequest.objects.send_checks(sender.pk, receiver.pk)
+        if checks['pending']:
             return Response(
-                {"detail": "A friend reques already exists."},
+                {"detail": "A friend request already exists."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        # Check if the receiver is already in the friend list
-        if sender.friends.filter(pk=receiver.pk).exists():
+        if checks['befriended']:
             return Response(
                 {"detail": "The receiver is already in the friend list."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-
-        # Check if the receiver has sent a friend request to the sender
-        reciprocal_request = FriendRequest.objects.filter(
-            sender=receiver, receiver=sender, is_active=True)
-        if reciprocal_request.exists():
+        if checks['reciprocal']:
             return Response(
                 {"detail": "The receiver already sent you a friend request."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Save the friend request
-        self.perform_create(serializer)
+        # Save the friend request. A concurrent send of the same request
+        # can still get in first, which the database constraint catches.
+        try:
+            with transaction.atomic():
+                self.perform_create(serializer)
+        except IntegrityError:
+            return Response(
+                {"detail": "A friend request already exists."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
         return Response(
             {"detail": "Friend request sent successfully."},
@@ -111,7 +197,9 @@ class RespondToFriendRequestView(generics.RetrieveUpdateDestroyAPIView):
     def get_object(self):
         friend_request_id = self.kwargs['pk']
         try:
-            friend_request = FriendRequest.objects.get(
+            friend_request = FriendRequest.objects.select_related(
+                'sender', 'receiver'
+            ).get(
                 Q(sender=self.request.user) | Q(receiver=self.request.user),
                 id=friend_request_id
             )
@@ -119,13 +207,6 @@ class RespondToFriendRequestView(generics.RetrieveUpdateDestroyAPIView):
         except FriendRequest.DoesNotExist:
             raise Http404("FriendRequest does not exist")
 
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        if instance.is_active:
-            instance.accept()
-        elif instance.is_active is False:
-            instance.decline()
-
 
 class FriendRequestListView(generics.ListAPIView):
     """
@@ -133,9 +214,20 @@ class FriendRequestListView(generics.ListAPIView):
     """
     serializer_class = FriendRequestListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
-        return FriendRequest.objects.filter(
+        queryset = FriendRequest.objects.filter(
             Q(receiver=self.request.user, is_active=True) |
             Q(sender=self.request.user, is_active=True)
         )
+        # Only join the users whose usernames were asked for
+        fields = requested_fields(
+            self.request, FriendRequestListSerializer.Meta.fields)
+        related = [
+            name for name in ('sender', 'receiver')
+            if f'{name}_username' in fields
+        ]
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset
@@ -1,8 +1,10 @@
 from rest_framework import serializers
+from drf_api.serializers import SparseFieldsetsMixin
 from .models import Profile
 
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for the Profile model to convert data to/from JSON.
     """
@@ -17,7 +19,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         Method to determine if the authenticated user is owner of the profile.
         """
         request = self.context['request']
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
 
     class Meta:
         model = Profile
@@ -0,0 +1,141 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from friends.models import FriendRequest
+from projects.models import Project, ProjectTombstone
+from tasks.models import Task, TaskTombstone
+
+# A step of SQLite's EXPLAIN QUERY PLAN that walks a whole table or
+# index. Only SEARCH steps look rows up by key.
+SQLITE_SCAN = re.compile(r'\bSCAN (?!CONSTANT ROW)')
+
+# PostgreSQL index scans, which only look rows up by key when the plan
+# shows an Index Cond for them
+POSTGRES_INDEX_SCAN = re.compile(
+    r'\b(?:Index Scan|Index Only Scan|Bitmap Index Scan)\b')
+
+# Queries that must use a specific index, not just any index
+EXPECTED_INDEXES = {
+    'Project tasks by completion': 'task_project_complete_idx',
+    'Task calendar, owned tasks': 'task_owner_due_date_idx',
+}
+
+
+def sqlite_full_scans(plan):
+    """
+    The steps of a SQLite plan that read a whole table or index.
+    """
+    return [line for line in plan.splitlines() if SQLITE_SCAN.search(line)]
+
+
+def postgres_full_scans(plan):
+    """
+    The nodes of a PostgreSQL plan that read a whole table or index:
+    sequential scans, and index scans without an Index Cond.
+    """
+    nodes = []
+    for line in plan.splitlines():
+        if '(cost=' in line:
+            nodes.append([line])
+        elif nodes:
+            nodes[-1].append(line)
+    return [
+        node[0].strip() for node in nodes
+        if 'Seq Scan' in node[0] or (
+            POSTGRES_INDEX_SCAN.search(node[0]) and
+            not any('Index Cond:' in line for line in node[1:]))
+    ]
+
+
+FULL_SCAN_CHECKS = {
+    'sqlite': sqlite_full_scans,
+    'postgresql': postgres_full_scans,
+}
+
+
+def hot_queries(user):
+    """
+    The querysets behind the busiest views, keyed by a short description.
+    """
+    now = timezone.now()
+    return {
+        'ProjectList': Project.objects.accessible_to(user),
+        'Projects by owner, newest first': Project.objects.filter(
+            owner=user).order_by('-created_at'),
+        'TaskList': Task.objects.accessible_to(user),
+        'TaskList by due date': Task.objects.accessible_to(
+            user).order_by('due_date'),
+        'Tasks by owner, newest first': Task.objects.filter(
+            owner=user).order_by('-created_at'),
+        'Task calendar, owned tasks': Task.objects.filter(
+            owner=user, due_date__range=(now.date(), now.date())
+        ).order_by().values('due_date').annotate(total=Count('pk')),
+        'Task calendar, shared tasks': Task.objects.shared_with(user).filter(
+            due_date__range=(now.date(), now.date())
+        ).order_by().values('due_date').annotate(total=Count('pk')),
+        'Project tasks by completion': Task.objects.filter(
+            project_id=0, complete=True
+        ).order_by().values('project_id').annotate(total=Count('pk')),
+        'Pending request between users': FriendRequest.objects.filter(
+            sender=user, receiver_id=0, is_active=True),
+        'FriendRequestList': FriendRequest.objects.filter(
+            Q(receiver=user, is_active=True) |
+            Q(sender=user, is_active=True)),
+        'Sync projects': Project.objects.accessible_to(user).filter(
+            updated_at__gte=now),
+        'Sync tasks': Task.objects.accessible_to(user).filter(
+            updated_at__gte=now),
+        'Sync project tombstones': ProjectTombstone.objects.filter(
+            user=user, deleted_at__gte=now),
+        'Sync task tombstones': TaskTombstone.objects.filter(
+            user=user, deleted_at__gte=now),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Check that every hot query in the views can be served by an index.
+
+    A query passes only if every table it reads is searched by key:
+    SEARCH steps on SQLite, and index scans with an Index Cond on
+    PostgreSQL. Walking a whole table or a whole index fails. On
+    PostgreSQL sequential scans are disabled for the check, so small
+    development tables do not hide a missing index.
+    """
+    help = 'Fail if any hot view query needs a full table or index scan.'
+
+    def handle(self, *args, **options):
+        full_scans = FULL_SCAN_CHECKS.get(connection.vendor)
+        if full_scans is None:
+            raise CommandError(
+                f'Query plans cannot be checked on {connection.vendor}.')
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            user = User(pk=0)
+            for name, queryset in hot_queries(user).items():
+                plan = queryset.explain()
+                expected = EXPECTED_INDEXES.get(name)
+                if full_scans(plan):
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'FULL SCAN  {name}'))
+                    self.stdout.write(plan)
+                elif expected and expected not in plan:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(
+                        f'WRONG INDEX {name}, expected {expected}'))
+                    self.stdout.write(plan)
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'INDEXED    {name}'))
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} hot queries are not served by the '
+                f'expected index.')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from drf_api import sync
+
+
+class Command(BaseCommand):
+    """
+    Delete sync tombstones older than the retention period.
+
+    Clients whose last sync is older than that get a full sync instead,
+    so the tombstones are no longer needed.
+    """
+    help = 'Delete sync tombstones older than SYNC_TOMBSTONE_DAYS.'
+
+    def handle(self, *args, **options):
+        deleted = sync.prune(timezone.now() - sync.retention())
+        self.stdout.write(
+            self.style.SUCCESS(f'Deleted {deleted} tombstones.'))
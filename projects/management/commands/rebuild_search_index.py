@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from drf_api.search import get_search_backend
+from projects.models import Project
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the full-text search index for projects and tasks.
+    """
+    help = 'Rebuild the project and task full-text search index.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        for model in (Project, Task):
+            backend.rebuild(model)
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt search index for {model._meta.verbose_name}.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    """
+    Recompute the stored task counters on every project.
+    """
+    help = 'Rebuild Project.task_count and Project.completed_task_count.'
+
+    def handle(self, *args, **options):
+        updated = Project.objects.rebuild_task_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt task counts for {updated} projects.'))
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.23 on 2026-10-18 07:51
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def rebuild_task_counts(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+
+    def count(**filters):
+        tasks = Task.objects.filter(
+            project_id=OuterRef('pk'), **filters
+        ).order_by().values('project_id').annotate(total=Count('pk'))
+        return Coalesce(
+            Subquery(tasks.values('total'), output_field=IntegerField()), 0)
+
+    Project.objects.update(
+        task_count=count(), completed_task_count=count(complete=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_project_created_id_idx'),
+        ('tasks', '0005_task_task_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            rebuild_task_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 3.2.23 on 2026-10-18 07:52
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Build the full-text index: a GIN index on the tsvector column on
+    PostgreSQL, or an FTS5 shadow table elsewhere.
+    """
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE projects_project SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(summary, '')), 'B')")
+        schema_editor.execute(
+            'CREATE INDEX projects_project_search_idx '
+            'ON projects_project USING gin (search_vector)')
+    else:
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE projects_project_fts USING fts5(title, summary)')
+        schema_editor.execute(
+            'INSERT INTO projects_project_fts (rowid, title, summary) '
+            'SELECT id, title, summary FROM projects_project')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS projects_project_search_idx')
+    else:
+        schema_editor.execute('DROP TABLE IF EXISTS projects_project_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_task_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
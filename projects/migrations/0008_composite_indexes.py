@@ -0,0 +1,17 @@
+# Generated by Django 3.2.23 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['owner', '-created_at'], name='project_owner_created_idx'),
+        ),
+    ]
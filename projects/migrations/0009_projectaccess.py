@@ -0,0 +1,48 @@
+# Generated by Django 3.2.23 on 2026-10-18 07:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_project_access(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    ProjectAccess = apps.get_model('projects', 'ProjectAccess')
+    through = Project.collaborators.through
+    rows = [
+        ProjectAccess(user_id=owner_id, project_id=pk, role='owner')
+        for pk, owner_id in Project.objects.values_list('pk', 'owner_id')
+    ]
+    rows += [
+        ProjectAccess(
+            user_id=user_id, project_id=project_id, role='collaborator')
+        for project_id, user_id in through.objects.values_list(
+            'project_id', 'user_id')
+    ]
+    ProjectAccess.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0008_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('collaborator', 'Collaborator')], max_length=16)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_access', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='projectaccess',
+            constraint=models.UniqueConstraint(fields=('user', 'project', 'role'), name='unique_project_access'),
+        ),
+        migrations.RunPython(
+            populate_project_access, migrations.RunPython.noop),
+    ]
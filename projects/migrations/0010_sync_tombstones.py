@@ -0,0 +1,41 @@
+# Generated by Django 3.2.23 on 2026-10-18 08:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0009_projectaccess'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['updated_at'], name='project_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='projecttombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='projecttombstone',
+            index=models.Index(fields=['user', 'deleted_at'], name='project_tombstone_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projecttombstone',
+            index=models.Index(fields=['deleted_at'], name='project_tombstone_deleted_idx'),
+        ),
+    ]
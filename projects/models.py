@@ -1,5 +1,69 @@
+from django.apps import apps
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
+from drf_api import access, cache, cascade, search, sync
+
+
+class ProjectQuerySet(models.QuerySet):
+    """
+    QuerySet with helpers for scoping projects to a user.
+    """
+    def accessible_to(self, user):
+        """
+        Projects the user owns or collaborates on.
+
+        Resolved with one indexed lookup on the ProjectAccess table, so no
+        join or DISTINCT is needed and the paginator's COUNT stays cheap.
+        """
+        return self.filter(pk__in=access.accessible_ids(Project, user))
+
+    def delete(self):
+        """
+        Delete the projects, letting their tasks be cleaned up in one
+        batch per project rather than one task at a time.
+        """
+        with cascade.deleting(Project, self.values_list('pk', flat=True)):
+            return super().delete()
+
+    def adjust_task_counts(self, project_id, total=0, completed=0):
+        """
+        Atomically add to a project's stored task counters.
+
+        The project is marked as updated, since its counts are part of
+        what clients sync.
+        """
+        if not total and not completed:
+            return
+        self.filter(pk=project_id).update(
+            task_count=F('task_count') + total,
+            completed_task_count=F('completed_task_count') + completed,
+            updated_at=timezone.now(),
+        )
+
+    def rebuild_task_counts(self):
+        """
+        Recompute the stored task counters from the tasks table.
+
+        Returns the number of projects updated.
+        """
+        Task = apps.get_model('tasks', 'Task')
+
+        def count(**filters):
+            tasks = Task.objects.filter(
+                project_id=OuterRef('pk'), **filters
+            ).order_by().values('project_id').annotate(total=Count('pk'))
+            return Coalesce(
+                Subquery(tasks.values('total'), output_field=IntegerField()),
+                0)
+
+        return self.update(
+            task_count=count(),
+            completed_task_count=count(complete=True),
+        )
 
 
 class Project(models.Model):
@@ -21,9 +85,126 @@ class Project(models.Model):
     image = models.ImageField(
         upload_to='images/', default='../rjstswgoqpakct7vhsy7', blank=True
     )
+    # Maintained by the Task signal handlers in tasks.models
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    completed_task_count = models.PositiveIntegerField(
+        default=0, editable=False)
+    # Only populated on PostgreSQL, see drf_api.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='project_created_id_idx'),
+            models.Index(
+                fields=['owner', '-created_at'],
+                name='project_owner_created_idx'),
+            models.Index(fields=['updated_at'], name='project_updated_idx'),
+        ]
 
     def __str__(self):
         return f'ID# {self.id}: {self.title}'
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the project, letting its tasks be cleaned up in one batch
+        rather than one task at a time.
+        """
+        with cascade.deleting(Project, [self.pk]):
+            return super().delete(*args, **kwargs)
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """
+        Save the project without writing back its task counters, which
+        are only changed through atomic updates, or its search vector,
+        which is rebuilt after every save.
+        """
+        if update_fields is None and not self._state.adding:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in (
+                    'task_count', 'completed_task_count', 'search_vector')
+            ]
+        super().save(
+            force_insert=force_insert, force_update=force_update,
+            using=using, update_fields=update_fields)
+
+
+class ProjectAccess(models.Model):
+    """
+    One row per user who can see a project, with their role.
+
+    Maintained from Project saves and collaborator changes.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='project_access')
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='access')
+    role = models.CharField(max_length=16, choices=access.ROLE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'project', 'role'],
+                name='unique_project_access'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} is {self.role} of project {self.project_id}'
+
+
+class ProjectTombstone(models.Model):
+    """
+    Records that a user can no longer see a project, because it was
+    deleted or they were removed as a collaborator.
+
+    Read by the sync endpoint and pruned by the prune_tombstones command.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='project_tombstones')
+    object_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'deleted_at'],
+                name='project_tombstone_user_idx'),
+            models.Index(
+                fields=['deleted_at'], name='project_tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} lost project {self.object_id}'
+
+
+# Keep the full-text search index up to date
+search.register(Project)
+
+# Keep the ProjectAccess table up to date
+access.register(Project, ProjectAccess)
+
+# Record tombstones for the sync endpoint
+sync.register(Project, ProjectTombstone)
+
+
+def project_audience(project_ids):
+    """
+    Ids of the users who see the projects in their project list, or as
+    the project of a task in their task list.
+    """
+    TaskAccess = apps.get_model('tasks', 'TaskAccess')
+    return ProjectAccess.objects.filter(
+        project_id__in=project_ids
+    ).values_list('user_id', flat=True).union(
+        TaskAccess.objects.filter(
+            task__project_id__in=project_ids
+        ).values_list('user_id', flat=True))
+
+
+# Invalidate cached lists when projects change
+cache.register(Project, project_audience)
@@ -1,12 +1,15 @@
 from django.contrib.humanize.templatetags.humanize import naturaltime
 from django.core.exceptions import ValidationError
+from django.db.models import Exists, OuterRef
 from rest_framework import serializers
+from drf_api.serializers import SparseFieldsetsMixin
 from .models import Project
 from tasks.models import Task
 from django.contrib.auth.models import User
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for listing projects.
     """
@@ -20,7 +23,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
     profile_id = serializers.ReadOnlyField(source='owner.profile.id')
     profile_image = serializers.ReadOnlyField(source='owner.profile.image.url')
     complete = serializers.BooleanField(read_only=True)
-    completed_task_count = serializers.SerializerMethodField()
+    completed_task_count = serializers.ReadOnlyField()
     uncompleted_task_count = serializers.SerializerMethodField()
 
     def validate_image(self, value):
@@ -42,7 +45,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
         Check if the current user is the owner.
         """
         request = self.context['request']
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
 
     def get_collaborator_details(self, obj):
         """
@@ -73,17 +76,11 @@ class ProjectListSerializer(serializers.ModelSerializer):
         """
         return naturaltime(obj.updated_at)
 
-    def get_completed_task_count(self, obj):
-        """
-        Count completed tasks for the project.
-        """
-        return Task.objects.filter(project=obj, complete=True).count()
-
     def get_uncompleted_task_count(self, obj):
         """
-        Count uncompleted tasks for the project.
+        Count uncompleted tasks for the project from its stored counters.
         """
-        return Task.objects.filter(project=obj, complete=False).count()
+        return obj.task_count - obj.completed_task_count
 
     class Meta:
         model = Project
@@ -95,7 +92,8 @@ class ProjectListSerializer(serializers.ModelSerializer):
         ]
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for project details.
     """
@@ -130,7 +128,7 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         Check if the current user is the owner.
         """
         request = self.context['request']
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
 
     def get_collaborator_details(self, obj):
         """
@@ -149,48 +147,48 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         request = self.context['request']
         return request.user in obj.collaborators.all()
 
-    def get_completed_tasks(self, obj):
+    def get_partitioned_tasks(self, obj):
         """
-        Get details of completed tasks in the project.
+        Fetch the project's tasks once and split them by completion.
+
+        The requesting user's collaborator membership is annotated on each
+        task, so no per-task query is needed. The result is cached on the
+        serializer for reuse by the completed and uncompleted task fields.
         """
-        request = self.context['request']
-        tasks = Task.objects.filter(project=obj, complete=True)
+        cache = getattr(self, '_partitioned_tasks', None)
+        if cache is not None and cache[0] == obj.pk:
+            return cache[1]
 
-        task_data = []
+        request = self.context['request']
+        tasks = Task.objects.filter(project=obj).annotate(
+            user_is_collaborator=Exists(
+                Task.collaborators.through.objects.filter(
+                    task_id=OuterRef('pk'), user_id=request.user.pk))
+        ).only('id', 'title', 'owner_id', 'complete')
 
+        partitioned = {True: [], False: []}
         for task in tasks:
-            is_owner = task.owner == request.user
-            is_collaborator = request.user in task.collaborators.all()
-
-            task_data.append({
+            partitioned[task.complete].append({
                 'id': task.id,
                 'name': task.title,
-                'is_owner': is_owner,
-                'is_collaborator': is_collaborator,
+                'is_owner': task.owner_id == request.user.pk,
+                'is_collaborator': task.user_is_collaborator,
             })
-        return task_data
+
+        self._partitioned_tasks = (obj.pk, partitioned)
+        return partitioned
+
+    def get_completed_tasks(self, obj):
+        """
+        Get details of completed tasks in the project.
+        """
+        return self.get_partitioned_tasks(obj)[True]
 
     def get_uncompleted_tasks(self, obj):
         """
         Get details of uncompleted tasks in the project.
         """
-        request = self.context['request']
-        tasks = Task.objects.filter(project=obj, complete=False)
-
-        task_data = []
-
-        for task in tasks:
-            is_owner = task.owner == request.user
-            is_collaborator = request.user in task.collaborators.all()
-
-            task_data.append({
-                'id': task.id,
-                'name': task.title,
-                'is_owner': is_owner,
-                'is_collaborator': is_collaborator,
-            })
-
-        return task_data
+        return self.get_partitioned_tasks(obj)[False]
 
     class Meta:
         model = Project
@@ -1,3 +1,137 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from drf_api import access
+from .models import Project, ProjectAccess
+
+
+@override_settings(LIST_CACHE_ENABLED=False)
+class ProjectAccessTests(TestCase):
+    """
+    ProjectAccess rows follow owners and collaborators, and decide what
+    the list and detail views show.
+    """
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.user = User.objects.create_user('user')
+        self.other = User.objects.create_user('other')
+        self.project = self.create_project('Project')
+
+    def create_project(self, title, owner=None):
+        return Project.objects.create(
+            owner=owner or self.owner, title=title, summary='',
+            due_date='2030-01-01')
+
+    def rows(self):
+        return set(ProjectAccess.objects.values_list(
+            'user_id', 'project_id', 'role'))
+
+    def visible(self, user):
+        """
+        Ids of the projects the user sees in the list view, and whether
+        they may read ``self.project``.
+        """
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/projects/')
+        self.assertEqual(response.status_code, 200)
+        listed = {project['id'] for project in response.json()}
+        detail = client.get(f'/projects/{self.project.pk}/')
+        self.assertIn(detail.status_code, (200, 403))
+        return listed, detail.status_code == 200
+
+    def assertVisibleTo(self, user):
+        self.assertEqual(self.visible(user), ({self.project.pk}, True))
+
+    def assertHiddenFrom(self, user):
+        self.assertEqual(self.visible(user), (set(), False))
+
+    def test_owner_row_on_create(self):
+        self.assertEqual(self.rows(), {
+            (self.owner.pk, self.project.pk, access.OWNER)})
+        self.assertVisibleTo(self.owner)
+        self.assertHiddenFrom(self.user)
+
+    def test_owner_change_moves_the_owner_row(self):
+        self.project.owner = self.other
+        self.project.save()
+        self.assertEqual(self.rows(), {
+            (self.other.pk, self.project.pk, access.OWNER)})
+        self.assertVisibleTo(self.other)
+        self.assertHiddenFrom(self.owner)
+
+    def test_add_and_remove_from_the_project(self):
+        self.project.collaborators.add(self.user, self.other)
+        self.assertIn(
+            (self.user.pk, self.project.pk, access.COLLABORATOR), self.rows())
+        self.assertVisibleTo(self.user)
+        self.assertVisibleTo(self.other)
+
+        self.project.collaborators.remove(self.user)
+        self.assertNotIn(
+            (self.user.pk, self.project.pk, access.COLLABORATOR), self.rows())
+        self.assertHiddenFrom(self.user)
+        self.assertVisibleTo(self.other)
+
+    def test_clear_from_the_project(self):
+        self.project.collaborators.add(self.user, self.other)
+        self.project.collaborators.clear()
+        self.assertEqual(self.rows(), {
+            (self.owner.pk, self.project.pk, access.OWNER)})
+        self.assertHiddenFrom(self.user)
+        self.assertHiddenFrom(self.other)
+        self.assertVisibleTo(self.owner)
+
+    def test_add_and_remove_from_the_user(self):
+        self.user.projects_collaborated.add(self.project)
+        self.assertIn(
+            (self.user.pk, self.project.pk, access.COLLABORATOR), self.rows())
+        self.assertVisibleTo(self.user)
+
+        self.user.projects_collaborated.remove(self.project)
+        self.assertNotIn(
+            (self.user.pk, self.project.pk, access.COLLABORATOR), self.rows())
+        self.assertHiddenFrom(self.user)
+
+    def test_clear_from_the_user(self):
+        other_project = self.create_project('Other project')
+        self.user.projects_collaborated.add(self.project, other_project)
+        self.other.projects_collaborated.add(self.project)
+
+        self.user.projects_collaborated.clear()
+        self.assertFalse(ProjectAccess.objects.filter(
+            user=self.user).exists())
+        self.assertHiddenFrom(self.user)
+        self.assertVisibleTo(self.other)
+
+    def test_owner_who_is_also_a_collaborator(self):
+        self.project.collaborators.add(self.owner)
+        self.project.collaborators.remove(self.owner)
+        self.assertVisibleTo(self.owner)
+
+    def test_grant_bulk_after_bulk_create(self):
+        projects = Project.objects.bulk_create([
+            Project(
+                owner=self.owner, title=f'Bulk {i}', summary='',
+                due_date='2030-01-01')
+            for i in range(3)
+        ])
+        if projects[0].pk is None:
+            projects = list(Project.objects.filter(
+                title__startswith='Bulk').order_by('pk'))
+        through = Project.collaborators.through
+        through.objects.bulk_create([
+            through(project_id=projects[0].pk, user_id=self.user.pk)])
+        access.grant_bulk(
+            Project, projects, [(self.user.pk, projects[0].pk)])
+
+        for project in projects:
+            self.assertIn(
+                (self.owner.pk, project.pk, access.OWNER), self.rows())
+        self.assertIn(
+            (self.user.pk, projects[0].pk, access.COLLABORATOR), self.rows())
+        owned = {self.project.pk} | {project.pk for project in projects}
+        self.project = projects[0]
+        self.assertVisibleTo(self.user)
+        self.assertEqual(self.visible(self.owner), (owned, True))
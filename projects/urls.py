@@ -4,5 +4,6 @@ from projects import views
 urlpatterns = [
     # URL patterns for project views
     path('projects/', views.ProjectList.as_view()),
+    path('projects/export/', views.ProjectExport.as_view()),
     path('projects/<int:pk>/', views.ProjectDetail.as_view())
 ]
\ No newline at end of file
@@ -3,21 +3,29 @@ from django.core.exceptions import ValidationError
 from rest_framework import status, generics, permissions, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db.models import Count, Max
 from .models import Project
-from django.db.models import Q
+from tasks.models import Task
 from .serializers import ProjectListSerializer, ProjectDetailSerializer
 from drf_api.permissions import (
     IsOwnerOrCollaborator, IsOwnerOrCollaboratorReadOnly)
+from drf_api.pagination import OptionalCursorPagination
+from drf_api.search import FullTextSearchFilter
+from drf_api.conditional import (
+    collaborator_ids, make_etag, not_modified, set_validators)
+from drf_api.cache import CachedListMixin
+from drf_api.serializers import requested_fields
+from drf_api.export import ExportView
 
 
-class ProjectList(generics.ListCreateAPIView):
+class ProjectList(CachedListMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating projects.
     """
     serializer_class = ProjectListSerializer
     permission_classes = [IsOwnerOrCollaborator, permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', ]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['owner', 'due_date', 'created_at']
     ordering = ['-created_at']
 
@@ -25,10 +33,19 @@ class ProjectList(generics.ListCreateAPIView):
         """
         Get the queryset for listing projects
         based on the user's ownership or collaboration.
+
+        Owner profiles and collaborators are loaded up front so the
+        serializer does not query them per project, but only when the
+        requested fields use them.
         """
-        queryset = Project.objects.filter(
-            Q(owner=self.request.user) | Q(collaborators=self.request.user)
-        ).distinct()
+        fields = requested_fields(
+            self.request, ProjectListSerializer.Meta.fields)
+        queryset = Project.objects.accessible_to(self.request.user)
+        if fields & {'owner', 'profile_id', 'profile_image'}:
+            queryset = queryset.select_related('owner__profile')
+        if fields & {'collaborators', 'collaborator_details',
+                     'is_collaborator'}:
+            queryset = queryset.prefetch_related('collaborators')
 
         return queryset
 
@@ -45,6 +62,20 @@ class ProjectList(generics.ListCreateAPIView):
         return self.create(request, *args, **kwargs)
 
 
+class ProjectExport(ExportView):
+    """
+    API view streaming every project the user can access as NDJSON or CSV.
+    """
+    queryset = Project.objects.all()
+    filename = 'projects'
+    export_fields = (
+        'id', 'owner', 'title', 'summary', 'collaborators', 'due_date',
+        'complete', 'task_count', 'completed_task_count',
+        'created_at', 'updated_at',
+    )
+    export_sources = {'owner': 'owner__username'}
+
+
 class ProjectDetail(APIView):
     """
     API view for retrieving, updating, and deleting a specific project.
@@ -55,9 +86,19 @@ class ProjectDetail(APIView):
     def get_object(self, pk):
         """
         Get the project object based on the provided primary key (pk).
+
+        The owner's profile is always joined, since the ETag depends on
+        it. Collaborators are only prefetched when the requested fields
+        use them.
         """
         try:
-            project = Project.objects.get(pk=pk)
+            fields = requested_fields(
+                self.request, ProjectDetailSerializer.Meta.fields)
+            queryset = Project.objects.select_related('owner__profile')
+            if fields & {'collaborators', 'collaborator_details',
+                         'is_collaborator'}:
+                queryset = queryset.prefetch_related('collaborators')
+            project = queryset.get(pk=pk)
             self.check_object_permissions(self.request, project)
             return project
         except Http404:
@@ -65,14 +106,41 @@ class ProjectDetail(APIView):
                 {"detail": "Project not found."},
                 status=status.HTTP_404_NOT_FOUND)
 
+    def get_validators(self, project):
+        """
+        Get the ETag and Last-Modified values for a project's detail
+        representation, covering the project, its owner's profile,
+        its collaborators and its tasks.
+        """
+        tasks = Task.objects.filter(project=project).aggregate(
+            count=Count('id'), last_updated=Max('updated_at'))
+        profile = project.owner.profile
+        last_modified = max(filter(None, [
+            project.updated_at, profile.updated_at, tasks['last_updated']]))
+        etag = make_etag(
+            project.pk, self.request.user.pk, project.updated_at.isoformat(),
+            profile.updated_at.isoformat(), tasks['count'], last_modified,
+            collaborator_ids(project),
+        )
+        return etag, last_modified
+
     def get(self, request, pk):
         """
         Handle HTTP GET request for retrieving a project.
+
+        Returns 304 Not Modified without serializing the project when the
+        client's cached copy is still current.
         """
         project = self.get_object(pk)
+        etag, last_modified = self.get_validators(project)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
         serializer = ProjectDetailSerializer(
             project, context={'request': request})
-        return Response(serializer.data)
+        return set_validators(
+            Response(serializer.data), etag, last_modified)
 
     def put(self, request, pk):
         """
@@ -80,7 +148,7 @@ class ProjectDetail(APIView):
         """
         try:
             project = self.get_object(pk)
-            if request.user != project.owner:
+            if request.user.pk != project.owner_id:
                 return Response(
                     {"detail": "You are not authorised to edit this project."},
                     status=status.HTTP_403_FORBIDDEN)
@@ -104,7 +172,7 @@ class ProjectDetail(APIView):
         """
         try:
             project = self.get_object(pk)
-            if request.user != project.owner:
+            if request.user.pk != project.owner_id:
                 return Response(
                     {"detail": "You may not delete this project."},
                     status=status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,155 @@
+import random
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from drf_api import access
+from projects.models import Project
+from tasks.models import Task
+
+
+class Rollback(Exception):
+    """
+    Raised to discard the benchmark data once timings are collected.
+    """
+
+
+class Command(BaseCommand):
+    """
+    Compare the OR-join + DISTINCT access filter with accessible_to().
+
+    Seeds users, projects and tasks with random collaborators inside a
+    transaction, checks that both strategies find the same objects for
+    a sample of users, times a paginated list and its COUNT for each,
+    then rolls everything back.
+    """
+    help = (
+        'Benchmark the project/task access filter. '
+        'All seeded data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--projects', type=int, default=10000)
+        parser.add_argument('--tasks', type=int, default=100000)
+        parser.add_argument('--collaborators', type=int, default=3)
+        parser.add_argument('--sample', type=int, default=50)
+        parser.add_argument('--page-size', type=int, default=10)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options)
+                self.report(options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, options):
+        """
+        Bulk insert the benchmark data set.
+
+        bulk_create skips the signals that maintain the access tables, so
+        their rows are added with ``access.grant_bulk``.
+        """
+        self.stdout.write('Seeding data...')
+        rng = random.Random(0)
+        due_date = date.today()
+
+        User.objects.bulk_create(
+            [User(username=f'bench-{i}') for i in range(options['users'])],
+            batch_size=1000)
+        user_ids = list(User.objects.filter(
+            username__startswith='bench-').values_list('id', flat=True))
+
+        Project.objects.bulk_create([
+            Project(
+                owner_id=rng.choice(user_ids), due_date=due_date,
+                title=f'Project {i}', summary='Benchmark project')
+            for i in range(options['projects'])
+        ], batch_size=1000)
+        project_rows = list(Project.objects.filter(
+            owner_id__in=user_ids).values_list('id', 'owner_id'))
+
+        tasks = []
+        for i in range(options['tasks']):
+            project_id, owner_id = rng.choice(project_rows)
+            tasks.append(Task(
+                owner_id=owner_id, project_id=project_id, due_date=due_date,
+                title=f'Task {i}', summary='Benchmark task'))
+        Task.objects.bulk_create(tasks, batch_size=1000)
+        task_rows = list(Task.objects.filter(
+            owner_id__in=user_ids).values_list('id', 'owner_id'))
+
+        for model, column, rows in ((Project, 'project_id', project_rows),
+                                    (Task, 'task_id', task_rows)):
+            pairs = self.add_collaborators(
+                model, column, [pk for pk, _ in rows],
+                user_ids, options['collaborators'], rng)
+            access.grant_bulk(model, [
+                model(pk=pk, owner_id=owner_id) for pk, owner_id in rows
+            ], pairs)
+
+    def add_collaborators(self, model, column, object_ids, user_ids, count,
+                          rng):
+        """
+        Attach random collaborators to every object in one bulk insert.
+
+        Returns the ``(user_id, object_id)`` pairs added.
+        """
+        pairs = [
+            (user_id, object_id)
+            for object_id in object_ids
+            for user_id in rng.sample(user_ids, count)
+        ]
+        through = model.collaborators.through
+        through.objects.bulk_create([
+            through(**{column: object_id, 'user_id': user_id})
+            for user_id, object_id in pairs
+        ], batch_size=5000)
+        return pairs
+
+    def report(self, options):
+        """
+        Time both strategies for each model over the same user sample.
+        """
+        rng = random.Random(1)
+        sample = rng.sample(
+            list(User.objects.filter(username__startswith='bench-')),
+            options['sample'])
+        page_size = options['page_size']
+
+        for model in (Project, Task):
+            strategies = {
+                'or-join + distinct': lambda user: model.objects.filter(
+                    Q(owner=user) | Q(collaborators=user)).distinct(),
+                'accessible_to': lambda user: (
+                    model.objects.accessible_to(user)),
+            }
+            # Both strategies must return the same rows, or the timings
+            # compare different work
+            total = 0
+            for user in sample:
+                expected, actual = (
+                    set(build(user).values_list('pk', flat=True))
+                    for build in strategies.values())
+                if expected != actual:
+                    raise CommandError(
+                        f'{model.__name__}: the strategies disagree for '
+                        f'user {user.pk}.')
+                total += len(actual)
+            self.stdout.write(
+                f'{model.__name__:<8} both strategies find {total} objects')
+            for name, build in strategies.items():
+                started = time.perf_counter()
+                for user in sample:
+                    queryset = build(user)
+                    queryset.count()
+                    list(queryset[:page_size])
+                elapsed = (time.perf_counter() - started) / len(sample)
+                self.stdout.write(
+                    f'{model.__name__:<8} {name:<20} '
+                    f'{elapsed * 1000:8.2f} ms per page + count')
@@ -0,0 +1,164 @@
+import io
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from drf_api.parsers import FastJSONParser
+from drf_api.renderers import FastJSONRenderer, orjson
+from projects.models import Project
+from projects.serializers import ProjectListSerializer
+from tasks.models import IMPORTANCE_CHOICES, Task
+from tasks.serializers import TaskListSerializer
+
+
+class Rollback(Exception):
+    """
+    Raised to discard the benchmark data once timings are collected.
+    """
+
+
+class Command(BaseCommand):
+    """
+    Compare JSONRenderer/JSONParser with FastJSONRenderer/FastJSONParser.
+
+    Seeds projects and tasks inside a transaction and serializes them
+    with the list serializers, so the payloads have the same shape, date
+    formats and text as real list responses. Each payload is rendered
+    and parsed by both pairs, the outputs are checked to be identical,
+    and the data is rolled back.
+    """
+    help = (
+        'Benchmark the JSON renderer and parser on list payloads. '
+        'All seeded data is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=100)
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument('--collaborators', type=int, default=3)
+        parser.add_argument('--rounds', type=int, default=50)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                'orjson is not installed, so the fast pair falls back to '
+                'the standard library.'))
+        try:
+            with transaction.atomic():
+                payloads = self.build_payloads(options)
+                for name, data in payloads.items():
+                    self.report(name, data, options['rounds'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def build_payloads(self, options):
+        """
+        Seed the data set and serialize it as the list views would.
+        """
+        self.stdout.write('Seeding data...')
+        rng = random.Random(0)
+        today = date.today()
+
+        owner = User.objects.create(username='bench-owner')
+        User.objects.bulk_create([
+            User(username=f'bench-collaborator-{i}')
+            for i in range(options['collaborators'] * 3)
+        ])
+        collaborator_ids = list(User.objects.filter(
+            username__startswith='bench-collaborator-'
+        ).values_list('id', flat=True))
+
+        projects = [
+            Project.objects.create(
+                owner=owner, title=f'Projet n°{i} – planning',
+                summary='Plan the next release, review the backlog and '
+                        'agree deadlines with everyone involved. ' * 3,
+                due_date=today + timedelta(days=rng.randint(0, 365)))
+            for i in range(options['projects'])
+        ]
+        tasks = []
+        for i in range(options['tasks']):
+            tasks.append(Task(
+                owner=owner, project=rng.choice(projects),
+                title=f'Tâche {i}: follow up “{rng.random():.6f}”',
+                summary='Write up the notes from the meeting and send '
+                        'them round before Friday. ' * 2,
+                importance=rng.choice(IMPORTANCE_CHOICES)[0],
+                due_date=today + timedelta(days=rng.randint(0, 365)),
+                complete=rng.random() < 0.3))
+        Task.objects.bulk_create(tasks, batch_size=1000)
+
+        for model, column in ((Project, 'project_id'), (Task, 'task_id')):
+            through = model.collaborators.through
+            through.objects.bulk_create([
+                through(**{column: object_id, 'user_id': user_id})
+                for object_id in model.objects.filter(
+                    owner=owner).values_list('id', flat=True)
+                for user_id in rng.sample(
+                    collaborator_ids, options['collaborators'])
+            ], batch_size=5000)
+
+        request = Request(APIRequestFactory().get('/'))
+        request.user = owner
+        context = {'request': request}
+        return {
+            'ProjectList': ProjectListSerializer(
+                Project.objects.filter(owner=owner).select_related(
+                    'owner__profile').prefetch_related('collaborators'),
+                many=True, context=context).data,
+            'TaskList': TaskListSerializer(
+                Task.objects.filter(owner=owner).select_related(
+                    'owner', 'project').prefetch_related('collaborators'),
+                many=True, context=context).data,
+        }
+
+    def report(self, name, data, rounds):
+        """
+        Time rendering and parsing one payload with both pairs.
+        """
+        pairs = {
+            'stdlib': (JSONRenderer(), JSONParser()),
+            'fast': (FastJSONRenderer(), FastJSONParser()),
+        }
+        rendered = {}
+        parsed = {}
+        timings = {}
+        for label, (renderer, parser) in pairs.items():
+            started = time.perf_counter()
+            for _ in range(rounds):
+                body = renderer.render(data)
+            render_time = (time.perf_counter() - started) / rounds
+
+            started = time.perf_counter()
+            for _ in range(rounds):
+                result = parser.parse(io.BytesIO(body))
+            parse_time = (time.perf_counter() - started) / rounds
+
+            rendered[label] = body
+            parsed[label] = result
+            timings[label] = (render_time, parse_time)
+
+        if rendered['stdlib'] != rendered['fast']:
+            raise CommandError(f'{name}: rendered output differs.')
+        if parsed['stdlib'] != parsed['fast']:
+            raise CommandError(f'{name}: parsed data differs.')
+
+        self.stdout.write(
+            f'{name} ({len(data)} items, {len(rendered["fast"])} bytes)')
+        for label, (render_time, parse_time) in timings.items():
+            self.stdout.write(
+                f'  {label:<7} render {render_time * 1000:8.2f} ms'
+                f'   parse {parse_time * 1000:8.2f} ms')
+        stdlib_render, stdlib_parse = timings['stdlib']
+        fast_render, fast_parse = timings['fast']
+        self.stdout.write(
+            f'  speedup render {stdlib_render / fast_render:6.1f}x'
+            f'   parse {stdlib_parse / fast_parse:6.1f}x')
@@ -0,0 +1,48 @@
+# Generated by Django 3.2.23 on 2026-10-18 07:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_task_access(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskAccess = apps.get_model('tasks', 'TaskAccess')
+    through = Task.collaborators.through
+    rows = [
+        TaskAccess(user_id=owner_id, task_id=pk, role='owner')
+        for pk, owner_id in Task.objects.values_list('pk', 'owner_id')
+    ]
+    rows += [
+        TaskAccess(
+            user_id=user_id, task_id=task_id, role='collaborator')
+        for task_id, user_id in through.objects.values_list(
+            'task_id', 'user_id')
+    ]
+    TaskAccess.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0007_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Owner'), ('collaborator', 'Collaborator')], max_length=16)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='tasks.task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_access', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskaccess',
+            constraint=models.UniqueConstraint(fields=('user', 'task', 'role'), name='unique_task_access'),
+        ),
+        migrations.RunPython(
+            populate_task_access, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,13 @@
-from django.db import models
+from collections import Counter
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
 from django.contrib.auth.models import User
-from projects.models import Project
+from projects.models import Project, ProjectAccess
+from drf_api import access, cache, cascade, search, sync
 
 # Choices for the 'importance' field
 IMPORTANCE_CHOICES = [
@@ -10,6 +17,110 @@ IMPORTANCE_CHOICES = [
 ]
 
 
+class TaskQuerySet(models.QuerySet):
+    """
+    QuerySet with helpers for scoping and bulk writing tasks.
+    """
+    def accessible_to(self, user):
+        """
+        Tasks the user owns or collaborates on.
+
+        Resolved with one indexed lookup on the TaskAccess table, so no
+        join or DISTINCT is needed and the paginator's COUNT stays cheap.
+        """
+        return self.filter(pk__in=access.accessible_ids(Task, user))
+
+    def shared_with(self, user):
+        """
+        Tasks the user collaborates on but does not own.
+
+        Together with ``filter(owner=user)`` this covers
+        ``accessible_to(user)`` without overlap, letting queries on owned
+        tasks use the indexes that lead with ``owner``.
+        """
+        return self.filter(pk__in=access.accessible_ids(
+            Task, user, role=access.COLLABORATOR)).exclude(owner=user)
+
+    def bulk_create_in_project(self, project, tasks, collaborator_ids):
+        """
+        Insert tasks for one project in a single transaction.
+
+        ``collaborator_ids`` holds a list of user ids per task. The tasks
+        and their collaborator rows are each written with one bulk insert,
+        and the work normally done by the Task signals (project counters,
+        access rows, search index and list cache) is done once for the
+        whole batch. Returns the ids of the new tasks.
+        """
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                self.bulk_create(tasks, batch_size=1000)
+            else:
+                # SQLite: the first insert takes the database write lock,
+                # which is held until the transaction ends, so no other
+                # connection can add tasks before the ids are read back.
+                # The new rows are the project's highest ids, in order.
+                self.bulk_create(tasks, batch_size=1000)
+                new_pks = list(self.filter(
+                    project=project
+                ).order_by('-pk').values_list('pk', flat=True)[:len(tasks)])
+                new_pks.reverse()
+                for task, pk in zip(tasks, new_pks):
+                    task.pk = pk
+            pks = [task.pk for task in tasks]
+
+            pairs = [
+                (user_id, task.pk)
+                for task, user_ids in zip(tasks, collaborator_ids)
+                for user_id in user_ids
+            ]
+            through = Task.collaborators.through
+            through.objects.bulk_create([
+                through(task_id=task_id, user_id=user_id)
+                for user_id, task_id in pairs
+            ], batch_size=1000)
+
+            Project.objects.adjust_task_counts(
+                project.pk, total=len(tasks),
+                completed=sum(task.complete for task in tasks))
+            access.grant_bulk(Task, tasks, pairs)
+            search.get_search_backend().index_many(Task, pks)
+            cache.bump_versions(cache.audience(Project, [project.pk]))
+        return pks
+
+    def update_in_bulk(self, **fields):
+        """
+        Apply the same field changes to every task in the queryset with a
+        single UPDATE.
+
+        Project counters and the list cache, normally maintained by the
+        Task signals, are updated for the whole batch. Only fields that do
+        not affect access or search may be changed this way. Returns the
+        number of tasks updated.
+
+        The tasks are locked as they are read, so the completion changes
+        counted for the project counters are the ones the UPDATE makes.
+        """
+        with transaction.atomic():
+            rows = list(self.select_for_update().order_by().values_list(
+                'pk', 'project_id', 'complete'))
+            pks = [pk for pk, _, _ in rows]
+            changes = Counter()
+            if 'complete' in fields:
+                changes.update(
+                    project_id for _, project_id, complete in rows
+                    if complete != fields['complete'])
+
+            updated = Task.objects.filter(pk__in=pks).update(
+                updated_at=timezone.now(), **fields)
+
+            for project_id, changed in changes.items():
+                Project.objects.adjust_task_counts(
+                    project_id,
+                    completed=changed if fields['complete'] else -changed)
+            cache.bump_versions(cache.audience(Task, pks))
+        return updated
+
+
 class Task(models.Model):
     """
     Model representing a task associated with a project.
@@ -27,12 +138,213 @@ class Task(models.Model):
         max_length=32, choices=IMPORTANCE_CHOICES, default='low'
     )
     complete = models.BooleanField(blank=True, null=False, default=False)
+    # Only populated on PostgreSQL, see drf_api.search
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], name='task_created_id_idx'),
+            models.Index(
+                fields=['project', 'complete'],
+                name='task_project_complete_idx'),
+            models.Index(
+                fields=['owner', '-created_at'],
+                name='task_owner_created_idx'),
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+            models.Index(
+                fields=['owner', 'due_date'], name='task_owner_due_date_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ]
 
     def __str__(self):
         """
         String representation of the task.
         """
         return f'ID# {self.id}: {self.title}'
+
+    def save(self, *args, **kwargs):
+        """
+        Save the task and update its project's counters in one transaction.
+        """
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+def remember_counted_state(sender, instance, update_fields=None, **kwargs):
+    """
+    Signal handler recording the project and completion state a task had
+    before this save, so the project counters can be adjusted afterwards.
+
+    The stored row is read under a row lock, which Task.save's
+    transaction holds until the counters are updated, so concurrent saves
+    of the same task each see the state the other left behind.
+    """
+    counted_fields = {'project', 'project_id', 'complete'}
+    if instance._state.adding or instance.pk is None:
+        previous = None
+    elif update_fields is not None and not counted_fields & set(
+            update_fields):
+        previous = {
+            'project_id': instance.project_id,
+            'complete': instance.complete,
+        }
+    else:
+        previous = Task.objects.select_for_update().filter(
+            pk=instance.pk).values('project_id', 'complete').first()
+    instance._counted_state = previous
+
+
+def update_task_counts(sender, instance, created, **kwargs):
+    """
+    Signal handler keeping Project.task_count and
+    Project.completed_task_count in step with a saved task.
+    """
+    previous = instance.__dict__.pop('_counted_state', None)
+    if created or previous is None:
+        Project.objects.adjust_task_counts(
+            instance.project_id, total=1, completed=int(instance.complete))
+    elif previous['project_id'] != instance.project_id:
+        # The task moved between projects
+        Project.objects.adjust_task_counts(
+            previous['project_id'],
+            total=-1, completed=-int(previous['complete']))
+        Project.objects.adjust_task_counts(
+            instance.project_id, total=1, completed=int(instance.complete))
+    elif previous['complete'] != instance.complete:
+        Project.objects.adjust_task_counts(
+            instance.project_id,
+            completed=1 if instance.complete else -1)
+
+
+def remember_deleted_state(sender, instance, **kwargs):
+    """
+    Signal handler locking a task that is about to be deleted and
+    recording the project and completion state it is stored with.
+
+    The in-memory task may be stale, and a concurrent delete of the same
+    task leaves nothing to discount.
+    """
+    if cascade.in_cascade(instance):
+        return
+    instance._counted_state = Task.objects.select_for_update().filter(
+        pk=instance.pk).values('project_id', 'complete').first()
+
+
+def discount_deleted_task(sender, instance, **kwargs):
+    """
+    Signal handler removing a deleted task from its project's counters.
+    """
+    previous = instance.__dict__.pop('_counted_state', None)
+    if previous is None:
+        return
+    Project.objects.adjust_task_counts(
+        previous['project_id'],
+        total=-1, completed=-int(previous['complete']))
+
+
+# Connect the signals to the Task model
+pre_save.connect(remember_counted_state, sender=Task)
+post_save.connect(update_task_counts, sender=Task)
+pre_delete.connect(remember_deleted_state, sender=Task)
+post_delete.connect(discount_deleted_task, sender=Task)
+
+
+class TaskAccess(models.Model):
+    """
+    One row per user who can see a task, with their role.
+
+    Maintained from Task saves and collaborator changes.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='task_access')
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='access')
+    role = models.CharField(max_length=16, choices=access.ROLE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'task', 'role'], name='unique_task_access'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} is {self.role} of task {self.task_id}'
+
+
+class TaskTombstone(models.Model):
+    """
+    Records that a user can no longer see a task, because it was deleted
+    or they were removed as a collaborator.
+
+    Read by the sync endpoint and pruned by the prune_tombstones command.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='task_tombstones')
+    object_id = models.PositiveIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', 'deleted_at'], name='task_tombstone_user_idx'),
+            models.Index(
+                fields=['deleted_at'], name='task_tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} lost task {self.object_id}'
+
+
+# Keep the full-text search index up to date
+search.register(Task)
+
+# Keep the TaskAccess table up to date
+access.register(Task, TaskAccess)
+
+# Record tombstones for the sync endpoint
+sync.register(Task, TaskTombstone)
+
+
+def task_audience(task_ids):
+    """
+    Ids of the users who see the tasks in their task list, or in the
+    task counts of their project list.
+    """
+    return TaskAccess.objects.filter(
+        task_id__in=task_ids
+    ).values_list('user_id', flat=True).union(
+        ProjectAccess.objects.filter(
+            project__task__in=task_ids
+        ).values_list('user_id', flat=True))
+
+
+# Invalidate cached lists when tasks change
+cache.register(Task, task_audience)
+
+
+def forget_project_tasks(sender, instance, **kwargs):
+    """
+    Signal handler doing the work of the Task delete handlers once for
+    all the tasks of a project being deleted.
+
+    Tombstones are recorded and search rows removed for the whole batch.
+    The project's counters go with it, and the users whose lists show
+    its tasks are all in the project's audience, whose lists the
+    project's own handler invalidates.
+    """
+    if instance.pk not in cascade.deleting_ids(Project):
+        return
+    task_ids = list(Task.objects.filter(
+        project_id=instance.pk).values_list('pk', flat=True))
+    if task_ids:
+        sync.record_deleted_many(Task, task_ids)
+        search.get_search_backend().remove_many(Task, task_ids)
+
+
+# Skip the per-task delete handlers when a whole project is deleted
+cascade.register(Task, 'project')
+pre_delete.connect(forget_project_tasks, sender=Project)
@@ -1,11 +1,13 @@
 from django.contrib.humanize.templatetags.humanize import naturaltime
 from rest_framework import serializers
-from .models import Task
+from drf_api.serializers import SparseFieldsetsMixin
+from .models import Task, IMPORTANCE_CHOICES
 from django.contrib.auth.models import User
 from projects.models import Project
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for listing tasks.
     """
@@ -26,7 +28,7 @@ class TaskListSerializer(serializers.ModelSerializer):
         Check if the current user is the owner of the task.
         """
         request = self.context['request']
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
 
     def get_is_collaborator(self, obj):
         """
@@ -91,7 +93,8 @@ class TaskListSerializer(serializers.ModelSerializer):
         ]
 
 
-class TaskDetailSerializer(serializers.ModelSerializer):
+class TaskDetailSerializer(
+        SparseFieldsetsMixin, serializers.ModelSerializer):
     """
     Serializer for detailed view of a task.
     """
@@ -111,7 +114,7 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         Check if the current user is the owner of the task.
         """
         request = self.context['request']
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
 
     def get_is_collaborator(self, obj):
         """
@@ -138,3 +141,132 @@ class TaskDetailSerializer(serializers.ModelSerializer):
             'importance', 'complete', 'created_at',
             'updated_at', 'is_owner', 'is_collaborator'
         ]
+
+
+class TaskBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Serializer for one task in a bulk creation request.
+
+    Collaborators are plain user ids, validated for the whole batch by
+    TaskBulkCreateSerializer.
+    """
+    collaborators = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list)
+
+    class Meta:
+        model = Task
+        fields = [
+            'title', 'summary', 'collaborators', 'due_date', 'importance',
+            'complete',
+        ]
+
+
+class TaskBulkCreateSerializer(serializers.Serializer):
+    """
+    Serializer for creating many tasks in one project at once.
+    """
+    max_tasks = 1000
+
+    project = serializers.PrimaryKeyRelatedField(
+        queryset=Project.objects.all())
+    tasks = TaskBulkItemSerializer(many=True, allow_empty=False)
+
+    def validate_project(self, value):
+        """
+        Validate the associated project to ensure the user is the owner.
+        """
+        request = self.context['request']
+        if value.owner != request.user:
+            raise serializers.ValidationError(
+                "You can only set the project to one where you are the owner.")
+        return value
+
+    def validate_tasks(self, value):
+        """
+        Limit the batch size and check every collaborator id with a
+        single query.
+        """
+        if len(value) > self.max_tasks:
+            raise serializers.ValidationError(
+                f"You can create at most {self.max_tasks} tasks at once.")
+
+        requested = {
+            user_id for task in value for user_id in task['collaborators']}
+        existing = set(User.objects.filter(
+            pk__in=requested).values_list('pk', flat=True))
+        missing = requested - existing
+        if missing:
+            raise serializers.ValidationError(
+                "Invalid collaborator ids: "
+                f"{', '.join(str(pk) for pk in sorted(missing))}.")
+        return value
+
+    def create(self, validated_data):
+        """
+        Create all tasks with their collaborators in one transaction.
+        """
+        project = validated_data['project']
+        owner = self.context['request'].user
+        tasks = []
+        collaborator_ids = []
+        for item in validated_data['tasks']:
+            collaborators = item.pop('collaborators')
+            tasks.append(Task(owner=owner, project=project, **item))
+            collaborator_ids.append(sorted(set(collaborators)))
+        Task.objects.bulk_create_in_project(project, tasks, collaborator_ids)
+        return tasks
+
+
+class TaskBulkUpdateSerializer(serializers.Serializer):
+    """
+    Serializer for applying the same changes to many tasks at once.
+    """
+    max_tasks = 1000
+    update_fields = ('complete', 'importance', 'due_date')
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False,
+        max_length=max_tasks)
+    complete = serializers.BooleanField(required=False)
+    importance = serializers.ChoiceField(
+        choices=IMPORTANCE_CHOICES, required=False)
+    due_date = serializers.DateField(required=False)
+
+    def validate(self, data):
+        """
+        Ensure at least one field is being changed.
+        """
+        if not any(field in data for field in self.update_fields):
+            raise serializers.ValidationError(
+                "Provide at least one of: "
+                f"{', '.join(self.update_fields)}.")
+        return data
+
+
+class TaskCalendarSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the task calendar.
+    """
+    max_days = 366
+    max_task_days = 31
+
+    start = serializers.DateField()
+    end = serializers.DateField()
+    include_tasks = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        """
+        Ensure the range is in order and small enough.
+        """
+        days = (data['end'] - data['start']).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                "The end date must not be before the start date.")
+        if days > self.max_days:
+            raise serializers.ValidationError(
+                f"The range may cover at most {self.max_days} days.")
+        if data['include_tasks'] and days > self.max_task_days:
+            raise serializers.ValidationError(
+                "Tasks can only be included for ranges of at most "
+                f"{self.max_task_days} days.")
+        return data
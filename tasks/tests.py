@@ -1,3 +1,228 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from drf_api import access
+from projects.models import Project
+from .models import Task, TaskAccess
+
+
+class TaskCounterTests(TestCase):
+    """
+    Project.task_count and Project.completed_task_count follow task
+    writes.
+    """
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.project = self.create_project('Project')
+        self.other_project = self.create_project('Other project')
+
+    def create_project(self, title):
+        return Project.objects.create(
+            owner=self.owner, title=title, summary='', due_date='2030-01-01')
+
+    def create_task(self, project=None, **kwargs):
+        return Task.objects.create(
+            owner=self.owner, project=project or self.project, summary='',
+            due_date='2030-01-01', **kwargs)
+
+    def assertCounts(self, project, total, completed):
+        project.refresh_from_db()
+        self.assertEqual(
+            (project.task_count, project.completed_task_count),
+            (total, completed))
+
+    def test_create(self):
+        self.create_task(title='Open')
+        self.create_task(title='Done', complete=True)
+        self.assertCounts(self.project, 2, 1)
+        self.assertCounts(self.other_project, 0, 0)
+
+    def test_toggle(self):
+        task = self.create_task(title='Task')
+        task.complete = True
+        task.save()
+        self.assertCounts(self.project, 1, 1)
+        task.complete = False
+        task.save()
+        self.assertCounts(self.project, 1, 0)
+
+    def test_save_of_a_stale_copy(self):
+        task = self.create_task(title='Task')
+        stale = Task.objects.get(pk=task.pk)
+        task.complete = True
+        task.save()
+        stale.complete = True
+        stale.save()
+        self.assertCounts(self.project, 1, 1)
+
+    def test_move(self):
+        task = self.create_task(title='Task', complete=True)
+        task.project = self.other_project
+        task.save()
+        self.assertCounts(self.project, 0, 0)
+        self.assertCounts(self.other_project, 1, 1)
+
+    def test_move_and_toggle(self):
+        task = self.create_task(title='Task', complete=True)
+        task.project = self.other_project
+        task.complete = False
+        task.save()
+        self.assertCounts(self.project, 0, 0)
+        self.assertCounts(self.other_project, 1, 0)
+
+    def test_save_without_counted_fields(self):
+        task = self.create_task(title='Task', complete=True)
+        task.title = 'Renamed'
+        task.save(update_fields=['title'])
+        self.assertCounts(self.project, 1, 1)
+
+    def test_delete(self):
+        task = self.create_task(title='Task', complete=True)
+        self.create_task(title='Other task')
+        task.delete()
+        self.assertCounts(self.project, 1, 0)
+
+    def test_delete_of_a_stale_copy(self):
+        task = self.create_task(title='Task')
+        stale = Task.objects.get(pk=task.pk)
+        task.complete = True
+        task.save()
+        stale.delete()
+        self.assertCounts(self.project, 0, 0)
+
+    def test_queryset_delete(self):
+        self.create_task(title='Task', complete=True)
+        self.create_task(title='Other task')
+        Task.objects.filter(project=self.project).delete()
+        self.assertCounts(self.project, 0, 0)
+
+    def test_rebuild_task_counts(self):
+        self.create_task(title='Open')
+        self.create_task(title='Done', complete=True)
+        self.create_task(project=self.other_project, title='Elsewhere')
+        Project.objects.update(task_count=7, completed_task_count=5)
+
+        call_command('rebuild_task_counts', stdout=io.StringIO())
+        self.assertCounts(self.project, 2, 1)
+        self.assertCounts(self.other_project, 1, 0)
+
+
+@override_settings(LIST_CACHE_ENABLED=False)
+class TaskAccessTests(TestCase):
+    """
+    TaskAccess rows follow owners and collaborators, and decide what the
+    list and detail views show.
+    """
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        self.user = User.objects.create_user('user')
+        self.other = User.objects.create_user('other')
+        self.project = Project.objects.create(
+            owner=self.owner, title='Project', summary='',
+            due_date='2030-01-01')
+        self.task = self.create_task('Task')
+
+    def create_task(self, title):
+        return Task.objects.create(
+            owner=self.owner, project=self.project, title=title, summary='',
+            due_date='2030-01-01')
+
+    def rows(self):
+        return set(TaskAccess.objects.values_list(
+            'user_id', 'task_id', 'role'))
+
+    def visible(self, user):
+        """
+        Ids of the tasks the user sees in the list view, and whether they
+        may read ``self.task``.
+        """
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/tasks/')
+        self.assertEqual(response.status_code, 200)
+        listed = {task['id'] for task in response.json()}
+        detail = client.get(f'/tasks/{self.task.pk}/')
+        self.assertIn(detail.status_code, (200, 403))
+        return listed, detail.status_code == 200
+
+    def assertVisibleTo(self, user):
+        self.assertEqual(self.visible(user), ({self.task.pk}, True))
+
+    def assertHiddenFrom(self, user):
+        self.assertEqual(self.visible(user), (set(), False))
+
+    def test_owner_row_on_create(self):
+        self.assertEqual(self.rows(), {
+            (self.owner.pk, self.task.pk, access.OWNER)})
+        self.assertVisibleTo(self.owner)
+        self.assertHiddenFrom(self.user)
+
+    def test_add_and_remove_from_the_task(self):
+        self.task.collaborators.add(self.user, self.other)
+        self.assertIn(
+            (self.user.pk, self.task.pk, access.COLLABORATOR), self.rows())
+        self.assertVisibleTo(self.user)
+        self.assertVisibleTo(self.other)
+
+        self.task.collaborators.remove(self.user)
+        self.assertNotIn(
+            (self.user.pk, self.task.pk, access.COLLABORATOR), self.rows())
+        self.assertHiddenFrom(self.user)
+        self.assertVisibleTo(self.other)
+
+    def test_clear_from_the_task(self):
+        self.task.collaborators.add(self.user, self.other)
+        self.task.collaborators.clear()
+        self.assertEqual(self.rows(), {
+            (self.owner.pk, self.task.pk, access.OWNER)})
+        self.assertHiddenFrom(self.user)
+        self.assertHiddenFrom(self.other)
+        self.assertVisibleTo(self.owner)
+
+    def test_add_and_remove_from_the_user(self):
+        self.user.tasks_collaborated.add(self.task)
+        self.assertIn(
+            (self.user.pk, self.task.pk, access.COLLABORATOR), self.rows())
+        self.assertVisibleTo(self.user)
+
+        self.user.tasks_collaborated.remove(self.task)
+        self.assertNotIn(
+            (self.user.pk, self.task.pk, access.COLLABORATOR), self.rows())
+        self.assertHiddenFrom(self.user)
+
+    def test_clear_from_the_user(self):
+        other_task = self.create_task('Other task')
+        self.user.tasks_collaborated.add(self.task, other_task)
+        self.other.tasks_collaborated.add(self.task)
+
+        self.user.tasks_collaborated.clear()
+        self.assertFalse(TaskAccess.objects.filter(user=self.user).exists())
+        self.assertHiddenFrom(self.user)
+        self.assertVisibleTo(self.other)
+
+    def test_project_access_does_not_grant_task_access(self):
+        self.project.collaborators.add(self.user)
+        self.assertHiddenFrom(self.user)
+
+    def test_grant_bulk_after_bulk_create(self):
+        ids = Task.objects.bulk_create_in_project(self.project, [
+            Task(
+                owner=self.owner, project=self.project, title=f'Bulk {i}',
+                summary='', due_date='2030-01-01')
+            for i in range(3)
+        ], [[self.user.pk], [], []])
+
+        for task_id in ids:
+            self.assertIn((self.owner.pk, task_id, access.OWNER), self.rows())
+        self.assertIn(
+            (self.user.pk, ids[0], access.COLLABORATOR), self.rows())
+        self.assertNotIn(
+            (self.user.pk, ids[1], access.COLLABORATOR), self.rows())
+        owned = {self.task.pk} | set(ids)
+        self.task = Task.objects.get(pk=ids[0])
+        self.assertVisibleTo(self.user)
+        self.assertEqual(self.visible(self.owner), (owned, True))
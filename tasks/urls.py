@@ -4,5 +4,9 @@ from tasks import views
 urlpatterns = [
     # URL paths for tasks views
     path('tasks/', views.TaskList.as_view()),
-    path('tasks/<int:pk>/', views.TaskDetail.as_view())
+    path('tasks/bulk/', views.TaskBulk.as_view()),
+    path('tasks/calendar/', views.TaskCalendar.as_view()),
+    path('tasks/export/', views.TaskExport.as_view()),
+    path('tasks/<int:pk>/', views.TaskDetail.as_view()),
+    path('dashboard/', views.Dashboard.as_view()),
 ]
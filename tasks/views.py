@@ -1,31 +1,60 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db.models import Count, Q
 from django.http import Http404
-from rest_framework import status, generics, permissions, filters
+from django.utils import timezone
+from rest_framework import (
+    status, generics, permissions, filters, serializers)
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import Task
-from .serializers import TaskListSerializer, TaskDetailSerializer
+from .models import IMPORTANCE_CHOICES, Task
+from projects.models import Project
+from .serializers import (
+    TaskListSerializer, TaskDetailSerializer, TaskBulkCreateSerializer,
+    TaskBulkUpdateSerializer, TaskCalendarSerializer)
+from drf_api.access import request_has_access
 from drf_api.permissions import IsOwnerOrCollaborator
-from django.db.models import Q
+from drf_api.pagination import OptionalCursorPagination
+from drf_api.search import FullTextSearchFilter
+from drf_api.conditional import (
+    collaborator_ids, make_etag, not_modified, set_validators)
+from drf_api.cache import CachedListMixin, get_or_set_for_user
+from drf_api.serializers import requested_fields
+from drf_api.export import ExportView
 
 
-class TaskList(generics.ListCreateAPIView):
+class TaskList(CachedListMixin, generics.ListCreateAPIView):
     """
     API view for listing and creating tasks.
     """
     serializer_class = TaskListSerializer
     permission_classes = [IsOwnerOrCollaborator, permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', ]
+    pagination_class = OptionalCursorPagination
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['due_date', 'created_at']
     ordering = ['-created_at']
 
     def get_queryset(self):
         """
         Get the queryset of tasks based on user ownership or collaboration.
+
+        Owner, project and collaborators are loaded up front so the
+        serializer does not query them per task, but only when the
+        requested fields use them.
         """
-        queryset = Task.objects.filter(
-            Q(owner=self.request.user) | Q(collaborators=self.request.user)
-        ).distinct()
+        fields = requested_fields(self.request, TaskListSerializer.Meta.fields)
+        queryset = Task.objects.accessible_to(self.request.user)
+        related = []
+        if 'owner' in fields:
+            related.append('owner')
+        if 'project_title' in fields:
+            related.append('project')
+        if related:
+            queryset = queryset.select_related(*related)
+        if fields & {'collaborators', 'collaborator_details',
+                     'is_collaborator'}:
+            queryset = queryset.prefetch_related('collaborators')
 
         return queryset
 
@@ -42,6 +71,167 @@ class TaskList(generics.ListCreateAPIView):
         return self.create(request, *args, **kwargs)
 
 
+class TaskBulk(generics.GenericAPIView):
+    """
+    API view for creating or updating many tasks at once.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_serializer_class(self):
+        if self.request.method == 'PATCH':
+            return TaskBulkUpdateSerializer
+        return TaskBulkCreateSerializer
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle bulk task creation.
+
+        Returns the project and the ids of the created tasks.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tasks = serializer.save()
+        return Response({
+            'project': serializer.validated_data['project'].pk,
+            'created': len(tasks),
+            'ids': [task.pk for task in tasks],
+        }, status=status.HTTP_201_CREATED)
+
+    def patch(self, request, *args, **kwargs):
+        """
+        Handle bulk task updates.
+
+        Access to every task is checked with one query, and the changes
+        are applied with one UPDATE. Returns a summary of the change
+        rather than the updated tasks.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        ids = set(data.pop('ids'))
+
+        tasks = Task.objects.accessible_to(request.user).filter(pk__in=ids)
+        allowed = set(tasks.values_list('pk', flat=True))
+        denied = ids - allowed
+        if denied:
+            return Response(
+                {"detail": "You are not authorised to update tasks: "
+                           f"{', '.join(str(pk) for pk in sorted(denied))}."},
+                status=status.HTTP_403_FORBIDDEN)
+
+        updated = Task.objects.filter(pk__in=allowed).update_in_bulk(**data)
+        return Response({
+            'updated': updated,
+            'ids': sorted(allowed),
+            'changes': {
+                field: serializer.fields[field].to_representation(value)
+                for field, value in data.items()
+            },
+        })
+
+
+class TaskExport(ExportView):
+    """
+    API view streaming every task the user can access as NDJSON or CSV.
+    """
+    queryset = Task.objects.all()
+    filename = 'tasks'
+    export_fields = (
+        'id', 'owner', 'project', 'project_title', 'title', 'summary',
+        'collaborators', 'due_date', 'importance', 'complete',
+        'created_at', 'updated_at',
+    )
+    export_sources = {
+        'owner': 'owner__username',
+        'project': 'project_id',
+        'project_title': 'project__title',
+    }
+
+
+class TaskCalendar(APIView):
+    """
+    API view returning per-day task counts for a range of due dates.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_counts(self, user, start, end):
+        """
+        Count the tasks due on each day, split by importance and
+        completion.
+
+        Owned and shared tasks are counted in one grouped query each, so
+        the owned tasks are read through the ``(owner, due_date)`` index
+        rather than the access table.
+        """
+        counts = {
+            f'{importance}_{state}': Count('id', filter=Q(
+                importance=importance, complete=state == 'complete'))
+            for importance, _ in IMPORTANCE_CHOICES
+            for state in ('complete', 'open')
+        }
+        totals = {}
+        for tasks in (Task.objects.filter(owner=user),
+                      Task.objects.shared_with(user)):
+            rows = tasks.filter(
+                due_date__range=(start, end)
+            ).order_by().values('due_date').annotate(**counts)
+            for row in rows:
+                day = totals.setdefault(row.pop('due_date'), Counter())
+                day.update(row)
+        return totals
+
+    def get(self, request):
+        """
+        Handle calendar requests.
+
+        Takes ``start`` and ``end`` dates and returns one entry per day,
+        including days with no tasks. With ``include_tasks=true`` the
+        tasks themselves are also returned, for short ranges only.
+        """
+        params = TaskCalendarSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start = params.validated_data['start']
+        end = params.validated_data['end']
+
+        counts = self.get_counts(request.user, start, end)
+        date_field = params.fields['start']
+
+        days = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            row = counts.get(day, {})
+            importance = {
+                level: {
+                    'complete': row.get(f'{level}_complete', 0),
+                    'open': row.get(f'{level}_open', 0),
+                }
+                for level, _ in IMPORTANCE_CHOICES
+            }
+            complete = sum(split['complete'] for split in importance.values())
+            total = complete + sum(
+                split['open'] for split in importance.values())
+            days.append({
+                'date': date_field.to_representation(day),
+                'total': total,
+                'complete': complete,
+                'open': total - complete,
+                'importance': importance,
+            })
+
+        data = {'days': days}
+        if params.validated_data['include_tasks']:
+            tasks = Task.objects.accessible_to(request.user).filter(
+                due_date__range=(start, end)
+            ).select_related(
+                'owner', 'project'
+            ).prefetch_related(
+                'collaborators'
+            ).order_by('due_date', 'pk')
+            data['tasks'] = TaskListSerializer(
+                tasks, many=True, context={'request': request}).data
+        return Response(data)
+
+
 class TaskDetail(APIView):
     """
     API view for retrieving, updating, and deleting a task.
@@ -52,29 +242,59 @@ class TaskDetail(APIView):
     def get_object(self, pk):
         """
         Get the task object by primary key, checking permissions.
+
+        The owner's profile and collaborators are only loaded when the
+        requested fields use them.
         """
         try:
-            task = Task.objects.get(pk=pk)
+            fields = requested_fields(
+                self.request, TaskDetailSerializer.Meta.fields)
+            queryset = Task.objects.all()
+            if fields & {'owner', 'profile_id'}:
+                queryset = queryset.select_related('owner__profile')
+            if fields & {'collaborators', 'collaborator_details',
+                         'is_collaborator'}:
+                queryset = queryset.prefetch_related('collaborators')
+            task = queryset.get(pk=pk)
             self.check_object_permissions(self.request, task)
             return task
         except Task.DoesNotExist:
             raise Http404
 
+    def get_validators(self, task):
+        """
+        Get the ETag and Last-Modified values for a task's detail
+        representation, covering the task and its collaborators.
+        """
+        etag = make_etag(
+            task.pk, self.request.user.pk, task.updated_at.isoformat(),
+            collaborator_ids(task),
+        )
+        return etag, task.updated_at
+
     def get(self, request, pk):
         """
         Handle task retrieval.
+
+        Returns 304 Not Modified without serializing the task when the
+        client's cached copy is still current.
         """
         task = self.get_object(pk)
+        etag, last_modified = self.get_validators(task)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
         serializer = TaskDetailSerializer(task, context={'request': request})
-        return Response(serializer.data)
+        return set_validators(
+            Response(serializer.data), etag, last_modified)
 
     def put(self, request, pk):
         """
         Handle task update.
         """
         task = self.get_object(pk)
-        if (request.user != task.owner) and (
-             request.user not in task.collaborators.all()):
+        if not request_has_access(request, task):
             return Response(
                 {"detail": "You are not authorised to perform this action."},
                 status=status.HTTP_403_FORBIDDEN)
@@ -90,7 +310,7 @@ class TaskDetail(APIView):
         Handle task deletion.
         """
         task = self.get_object(pk)
-        if request.user != task.owner:
+        if request.user.pk != task.owner_id:
             return Response(
                 {"detail": "You are not authorised to perform this action."},
                 status=status.HTTP_403_FORBIDDEN)
@@ -98,3 +318,86 @@ class TaskDetail(APIView):
         return Response(
             status=status.HTTP_204_NO_CONTENT
         )
+
+
+class Dashboard(APIView):
+    """
+    API view returning the totals shown on the home screen.
+
+    Computed with one conditional aggregate query per model and cached
+    per user until anything the user can see changes.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    due_soon_days = 7
+
+    def get_task_totals(self, user, today):
+        """
+        Count the user's tasks by importance, completion and due date.
+        """
+        counts = {
+            'total': Count('id'),
+            'completed': Count('id', filter=Q(complete=True)),
+            'overdue': Count(
+                'id', filter=Q(complete=False, due_date__lt=today)),
+            'due_today': Count(
+                'id', filter=Q(complete=False, due_date=today)),
+        }
+        for importance, _ in IMPORTANCE_CHOICES:
+            counts[f'{importance}_total'] = Count(
+                'id', filter=Q(importance=importance))
+            counts[f'{importance}_open'] = Count(
+                'id', filter=Q(importance=importance, complete=False))
+        totals = Task.objects.accessible_to(user).aggregate(**counts)
+        return {
+            'total': totals['total'],
+            'complete': totals['completed'],
+            'open': totals['total'] - totals['completed'],
+            'overdue': totals['overdue'],
+            'due_today': totals['due_today'],
+            'importance': {
+                importance: {
+                    'total': totals[f'{importance}_total'],
+                    'open': totals[f'{importance}_open'],
+                }
+                for importance, _ in IMPORTANCE_CHOICES
+            },
+        }
+
+    def get_project_totals(self, user, today):
+        """
+        Count the user's projects by completion and due date.
+        """
+        totals = Project.objects.accessible_to(user).aggregate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(complete=True)),
+            overdue=Count('id', filter=Q(complete=False, due_date__lt=today)),
+            due_soon=Count('id', filter=Q(
+                complete=False, due_date__range=(
+                    today, today + timedelta(days=self.due_soon_days)))),
+        )
+        return {
+            'total': totals['total'],
+            'complete': totals['completed'],
+            'open': totals['total'] - totals['completed'],
+            'overdue': totals['overdue'],
+            'due_soon': totals['due_soon'],
+        }
+
+    def get(self, request):
+        """
+        Handle dashboard requests.
+        """
+        user = request.user
+        today = timezone.localdate()
+
+        def compute():
+            return {
+                'date': serializers.DateField().to_representation(today),
+                'due_soon_days': self.due_soon_days,
+                'projects': self.get_project_totals(user, today),
+                'tasks': self.get_task_totals(user, today),
+            }
+
+        # The date is part of the key, as overdue counts change daily
+        return Response(get_or_set_for_user(
+            f'dashboard:{today.isoformat()}', user.pk, compute))